@@ -16,47 +16,103 @@ import yaml
 import psutil
 from datetime import datetime
 from collections import deque
-from queue import Queue, Empty
+from queue import Queue, Empty, Full
 import logging
 
+from ipc import PackedQueue, SharedConfig, SharedState, make_channel, make_shared_state, shared_memory
+
+TASK_SLOTS = {'transcript_monitor': 0, 'note_generator': 1, 'ui_manager': 2}
+
+# Imported once in the forkserver so every worker forks with them loaded
+PRELOAD_MODULES = ['openai', 'httpx']
+
+LOG_FORMAT = '%(asctime)s - %(processName)s - %(levelname)s - %(message)s'
+
+def configure_logging(log_file):
+    logging.basicConfig(
+        level=logging.INFO,
+        format=LOG_FORMAT,
+        handlers=[
+            logging.FileHandler(log_file),
+            logging.StreamHandler()
+        ]
+    )
+
+# Per-worker context, populated by the pool initializer
+_worker = {}
+
+def _init_worker(config, queues, shared_state, shutdown_event, ready_events, task_pids, log_file):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    if not logging.getLogger().handlers:
+        configure_logging(log_file)
+    if isinstance(config, SharedConfig):
+        config = config.load()
+    _worker.update(
+        config=config,
+        queues=queues,
+        shared_state=shared_state,
+        shutdown_event=shutdown_event,
+        ready_events=ready_events,
+        task_pids=task_pids
+    )
+
 # Module-level functions for multiprocessing
-def run_transcript_monitor(config, output_queue, shared_state, shutdown_event):
+def run_transcript_monitor():
+    _worker['task_pids'][TASK_SLOTS['transcript_monitor']] = os.getpid()
     from transcript_monitor import TranscriptMonitor
-    monitor = TranscriptMonitor(config, output_queue, shared_state, shutdown_event)
+    monitor = TranscriptMonitor(_worker['config'], _worker['queues']['transcript'],
+                                _worker['shared_state'], _worker['shutdown_event'],
+                                ready_event=_worker['ready_events']['transcript_monitor'])
     monitor.run()
 
-def run_note_generator(config, input_queue, output_queue, shared_state, shutdown_event):
+def run_note_generator():
+    _worker['task_pids'][TASK_SLOTS['note_generator']] = os.getpid()
     from note_generator import NoteGenerator
-    generator = NoteGenerator(config, input_queue, output_queue, shared_state, shutdown_event)
+    generator = NoteGenerator(_worker['config'], _worker['queues']['transcript'], _worker['queues']['notes'],
+                              _worker['shared_state'], _worker['shutdown_event'],
+                              ready_event=_worker['ready_events']['note_generator'])
     generator.run()
 
-def run_ui_manager(config, queues, shared_state, shutdown_event, tmux_session):
+def run_ui_manager(tmux_session):
+    _worker['task_pids'][TASK_SLOTS['ui_manager']] = os.getpid()
     from ui_manager import UIManager
-    ui = UIManager(config, queues, shared_state, shutdown_event, tmux_session)
+    ui = UIManager(_worker['config'], _worker['queues'], _worker['shared_state'],
+                   _worker['shutdown_event'], tmux_session,
+                   ready_event=_worker['ready_events']['ui_manager'])
     ui.run()
 
 class SystemCoordinator:
     def __init__(self, config_path="config.yaml"):
         self.config = self.load_config(config_path)
         self.setup_logging()
+        self.setup_mp_context()
         
-        self.processes = {}
+        self.tasks = {}
+        self.worker_pool = None
+        self._shared_config = SharedConfig(self.config) if shared_memory else None
+        self._task_pids = self.mp_ctx.RawArray('i', len(TASK_SLOTS))
+        ring_slots = self.config['architecture']['ring_slots']
+        ring_slot_bytes = self.config['architecture']['ring_slot_kb'] * 1024
         self.queues = {
-            'transcript': mp.Queue(),
-            'notes': mp.Queue(), 
-            'ui_commands': mp.Queue(),
-            'status': mp.Queue()
+            'transcript': make_channel(f"rt_transcript_{os.getpid()}", ring_slots, ring_slot_bytes, self.mp_ctx),
+            'notes': make_channel(f"rt_notes_{os.getpid()}", ring_slots, ring_slot_bytes, self.mp_ctx),
+            'ui_commands': PackedQueue(ctx=self.mp_ctx),
+            'status': PackedQueue(ctx=self.mp_ctx)
         }
         
-        self.shared_state = mp.Manager().dict()
-        self.shared_state['running'] = True
-        self.shared_state['memory_usage'] = 0
-        self.shared_state['last_processed'] = 0
-        self.shared_state['total_segments'] = 0
+        self.shared_state = make_shared_state(self.mp_ctx)
         
-        self.shutdown_event = mp.Event()
+        self.shutdown_event = self.mp_ctx.Event()
+        self._ready = {name: self.mp_ctx.Event() for name in TASK_SLOTS}
         self.tmux_session = None
         
+        self._self_proc = psutil.Process()
+        self._self_proc.cpu_percent(interval=None)
+        self._child_procs = {}
+        self._process_generation = 0
+        self._child_generation = -1
+        
         signal.signal(signal.SIGINT, self.signal_handler)
         signal.signal(signal.SIGTERM, self.signal_handler)
         
@@ -67,8 +123,10 @@ class SystemCoordinator:
         config.setdefault('architecture', {})
         config['architecture'].setdefault('use_tmux', True)
         config['architecture'].setdefault('max_memory_mb', 500)
-        config['architecture'].setdefault('process_restart_delay', 5)
         config['architecture'].setdefault('health_check_interval', 30)
+        config['architecture'].setdefault('ring_slots', 64)
+        config['architecture'].setdefault('ring_slot_kb', 64)
+        config['architecture'].setdefault('start_method', 'forkserver')
         
         return config
         
@@ -76,16 +134,22 @@ class SystemCoordinator:
         log_dir = "logs"
         os.makedirs(log_dir, exist_ok=True)
         
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(processName)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(f"{log_dir}/coordinator_{datetime.now():%Y%m%d_%H%M%S}.log"),
-                logging.StreamHandler()
-            ]
-        )
+        self.log_file = os.path.abspath(f"{log_dir}/coordinator_{datetime.now():%Y%m%d_%H%M%S}.log")
+        configure_logging(self.log_file)
         self.logger = logging.getLogger(__name__)
         
+    def setup_mp_context(self):
+        method = self.config['architecture']['start_method']
+        if method not in mp.get_all_start_methods():
+            self.logger.warning(f"Start method '{method}' not supported here, using 'spawn'")
+            method = 'spawn'
+            
+        self.mp_ctx = mp.get_context(method)
+        if method == 'forkserver':
+            self.mp_ctx.set_forkserver_preload(PRELOAD_MODULES)
+            
+        self.logger.info(f"Using '{method}' start method for subsystem workers")
+        
     def setup_tmux_session(self):
         if not self.config['architecture'].get('use_tmux', True):
             return False
@@ -98,26 +162,19 @@ class SystemCoordinator:
             self.logger.info(f"Attaching to existing tmux session: {session_name}")
         except subprocess.CalledProcessError:
             self.logger.info(f"Creating new tmux session: {session_name}")
-            subprocess.run([
-                'tmux', 'new-session', '-d', '-s', session_name, '-n', 'coordinator'
-            ])
             
-            subprocess.run([
-                'tmux', 'split-window', '-t', f'{session_name}:0', '-h'
-            ])
-            subprocess.run([
-                'tmux', 'split-window', '-t', f'{session_name}:0.0', '-v'
-            ])
-            subprocess.run([
-                'tmux', 'split-window', '-t', f'{session_name}:0.2', '-v'
-            ])
+            tmux_cmd = [
+                'tmux', 'new-session', '-d', '-s', session_name, '-n', 'coordinator',
+                ';', 'split-window', '-t', f'{session_name}:0', '-h',
+                ';', 'split-window', '-t', f'{session_name}:0.0', '-v',
+                ';', 'split-window', '-t', f'{session_name}:0.2', '-v'
+            ]
             
             pane_titles = ['Coordinator', 'Transcript Monitor', 'Note Generator', 'System Status']
             for i, title in enumerate(pane_titles):
-                subprocess.run([
-                    'tmux', 'select-pane', '-t', f'{session_name}:0.{i}', 
-                    '-T', title
-                ])
+                tmux_cmd += [';', 'select-pane', '-t', f'{session_name}:0.{i}', '-T', title]
+                
+            subprocess.run(tmux_cmd)
         
         self.tmux_session = session_name
         return True
@@ -134,84 +191,106 @@ class SystemCoordinator:
         except Exception as e:
             self.logger.error(f"Failed to send command to tmux pane {pane_idx}: {e}")
             
-    def start_transcript_monitor(self):
-        process = mp.Process(
-            target=run_transcript_monitor, 
-            args=(self.config, self.queues['transcript'], self.shared_state, self.shutdown_event),
-            name="TranscriptMonitor"
+    def start_worker_pool(self):
+        self.worker_pool = self.mp_ctx.Pool(
+            processes=len(TASK_SLOTS) + 1,
+            initializer=_init_worker,
+            initargs=(self._shared_config or self.config, self.queues, self.shared_state, self.shutdown_event,
+                      self._ready, self._task_pids, self.log_file)
         )
-        process.start()
-        self.processes['transcript_monitor'] = process
-        self.logger.info("Started Transcript Monitor process")
+        self.logger.info(f"Started worker pool with {len(TASK_SLOTS) + 1} workers")
+        
+    def submit_task(self, name, func, args=()):
+        self._task_pids[TASK_SLOTS[name]] = 0
+        self._ready[name].clear()
+        self.tasks[name] = self.worker_pool.apply_async(func, args)
+        self._process_generation += 1
+        
+    def start_transcript_monitor(self):
+        self.submit_task('transcript_monitor', run_transcript_monitor)
+        self.logger.info("Started Transcript Monitor task")
         
     def start_note_generator(self):
-        process = mp.Process(
-            target=run_note_generator,
-            args=(self.config, self.queues['transcript'], self.queues['notes'], 
-                  self.shared_state, self.shutdown_event),
-            name="NoteGenerator"
-        )
-        process.start()
-        self.processes['note_generator'] = process
-        self.logger.info("Started Note Generator process")
+        self.submit_task('note_generator', run_note_generator)
+        self.logger.info("Started Note Generator task")
         
     def start_ui_manager(self):
-        process = mp.Process(
-            target=run_ui_manager,
-            args=(self.config, self.queues, self.shared_state, 
-                  self.shutdown_event, self.tmux_session),
-            name="UIManager"
-        )
-        process.start()
-        self.processes['ui_manager'] = process
-        self.logger.info("Started UI Manager process")
+        self.submit_task('ui_manager', run_ui_manager, (self.tmux_session,))
+        self.logger.info("Started UI Manager task")
+        
+    def task_pid(self, name):
+        return self._task_pids[TASK_SLOTS[name]] or None
+        
+    def is_task_alive(self, name):
+        if self.tasks[name].ready():
+            return False
+        pid = self.task_pid(name)
+        # A task without a pid is still queued for an idle worker
+        return pid is None or psutil.pid_exists(pid)
+        
+    def scan_child_processes(self):
+        # Recursive: under forkserver the pool workers are children of the
+        # forkserver process, not of the coordinator
+        # Keep existing handles so their cpu_percent baselines survive
+        self._child_procs = {
+            child.pid: self._child_procs.get(child.pid, child)
+            for child in self._self_proc.children(recursive=True)
+        }
+        self._child_generation = self._process_generation
         
     def monitor_system_health(self):
         while not self.shutdown_event.is_set():
             try:
-                current_process = psutil.Process()
-                memory_info = current_process.memory_info()
-                memory_mb = memory_info.rss / 1024 / 1024
-                
+                with self._self_proc.oneshot():
+                    memory_mb = self._self_proc.memory_full_info().uss / 1024 / 1024
+                    cpu_percent = self._self_proc.cpu_percent(interval=None)
+                    
                 self.shared_state['memory_usage'] = memory_mb
                 
-                cpu_percent = current_process.cpu_percent(interval=1)
-                
-                children = current_process.children(recursive=True)
+                if self._child_generation != self._process_generation:
+                    self.scan_child_processes()
+                    
+                # USS counts only pages private to each process, so pages shared
+                # with the forkserver are not summed once per worker
                 total_memory = memory_mb
-                for child in children:
+                for child in self._child_procs.values():
                     try:
-                        child_memory = child.memory_info().rss / 1024 / 1024
-                        total_memory += child_memory
-                    except:
+                        with child.oneshot():
+                            total_memory += child.memory_full_info().uss / 1024 / 1024
+                            cpu_percent += child.cpu_percent(interval=None)
+                    except psutil.NoSuchProcess:
+                        # The pool replaced this worker; rescan next tick
+                        self._process_generation += 1
+                    except psutil.Error:
                         pass
                 
                 status_msg = {
                     'timestamp': datetime.now().isoformat(),
                     'cpu_percent': cpu_percent,
                     'memory_mb': total_memory,
-                    'num_processes': len(self.processes),
+                    'num_processes': len(self.tasks),
                     'processes_status': {}
                 }
                 
-                for name, process in self.processes.items():
+                for name in self.tasks:
+                    alive = self.is_task_alive(name)
                     status_msg['processes_status'][name] = {
-                        'alive': process.is_alive(),
-                        'pid': process.pid if process.is_alive() else None
+                        'alive': alive,
+                        'pid': self.task_pid(name) if alive else None
                     }
                 
                 try:
                     self.queues['status'].put_nowait(status_msg)
-                except:
+                except Full:
                     pass
                 
                 if total_memory > self.config['architecture']['max_memory_mb']:
                     self.logger.warning(f"Memory usage ({total_memory:.1f}MB) exceeds limit ({self.config['architecture']['max_memory_mb']}MB)")
                     self.trigger_memory_cleanup()
                 
-                for name, process in list(self.processes.items()):
-                    if not process.is_alive():
-                        self.logger.error(f"Process {name} died unexpectedly")
+                for name in list(self.tasks):
+                    if not self.is_task_alive(name):
+                        self.logger.error(f"Task {name} died unexpectedly")
                         self.restart_process(name)
                 
                 time.sleep(self.config['architecture']['health_check_interval'])
@@ -225,21 +304,19 @@ class SystemCoordinator:
         
         try:
             self.queues['ui_commands'].put_nowait({'command': 'cleanup_memory'})
-        except:
+        except Full:
             pass
             
     def restart_process(self, process_name):
         self.logger.info(f"Attempting to restart {process_name}")
         
-        old_process = self.processes.get(process_name)
-        if old_process and old_process.is_alive():
-            old_process.terminate()
-            old_process.join(timeout=5)
-            if old_process.is_alive():
-                old_process.kill()
+        old_task = self.tasks.get(process_name)
+        if old_task and old_task.ready():
+            try:
+                old_task.get()
+            except Exception as e:
+                self.logger.error(f"{process_name} failed: {e}")
                 
-        time.sleep(self.config['architecture']['process_restart_delay'])
-        
         if process_name == 'transcript_monitor':
             self.start_transcript_monitor()
         elif process_name == 'note_generator':
@@ -255,18 +332,25 @@ class SystemCoordinator:
         self.logger.info("Starting graceful shutdown...")
         self.shutdown_event.set()
         
-        for name, process in self.processes.items():
-            self.logger.info(f"Terminating {name}...")
-            process.terminate()
+        if self.worker_pool:
+            self.worker_pool.close()
+            deadline = time.time() + 5
+            for name, task in self.tasks.items():
+                task.wait(timeout=max(0, deadline - time.time()))
+                if not task.ready():
+                    self.logger.warning(f"{name} did not stop in time")
+            self.worker_pool.terminate()
+            self.worker_pool.join()
             
-        for name, process in self.processes.items():
-            process.join(timeout=5)
-            if process.is_alive():
-                self.logger.warning(f"Force killing {name}")
-                process.kill()
-                
         self.logger.info("All processes terminated")
         
+        for name in ('transcript', 'notes'):
+            self.queues[name].close()
+        if isinstance(self.shared_state, SharedState):
+            self.shared_state.close()
+        if self._shared_config:
+            self._shared_config.close()
+        
         if self.tmux_session:
             self.logger.info(f"Tmux session '{self.tmux_session}' remains active for review")
             
@@ -281,14 +365,15 @@ class SystemCoordinator:
             if not self.setup_tmux_session():
                 self.logger.warning("tmux not available, falling back to standard output")
         
-        self.start_transcript_monitor()
-        time.sleep(1)
+        self.start_worker_pool()
         
+        self.start_transcript_monitor()
         self.start_note_generator()
-        time.sleep(1)
-        
         self.start_ui_manager()
-        time.sleep(1)
+        
+        for name, ready in self._ready.items():
+            if not ready.wait(timeout=10):
+                self.logger.error(f"{name} did not report ready within 10s")
         
         health_thread = threading.Thread(target=self.monitor_system_health)
         health_thread.daemon = True
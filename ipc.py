@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+IPC Channels - Shared-memory transport between subsystem processes
+Ring buffer of pre-serialized payloads, used in place of mp.Queue
+"""
+
+import multiprocessing as mp
+import multiprocessing.queues
+import os
+import pickle
+import struct
+from queue import Empty, Full
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+SLOT_HEADER = struct.Struct('<Q')
+BUSY_BIT = 1 << 63
+SPILL_BIT = 1 << 62
+SIZE_MASK = SPILL_BIT - 1
+HEAD, TAIL = 0, 1
+
+
+def pack(obj):
+    if msgpack is not None:
+        return msgpack.packb(obj, use_bin_type=True)
+    return pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def unpack(blob):
+    if msgpack is not None:
+        return msgpack.unpackb(blob, raw=False)
+    return pickle.loads(blob)
+
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # track= only exists on Python 3.13+
+        return shared_memory.SharedMemory(name=name)
+
+
+class ShmRing:
+    """
+    Bounded ring of fixed-size slots in a SharedMemory block.
+    Each slot is an 8-byte size word (high bit = busy) followed by the
+    payload. Head/tail counters live in a RawArray, and a semaphore pair
+    tracks free/filled slots so get/put block like mp.Queue.
+    Payloads larger than a slot are spilled to their own SharedMemory
+    block; the slot then only carries its (name, size) descriptor.
+    Every put also rings a non-blocking self-pipe ("doorbell"), so a
+    consumer can select() on `reader` alongside other queues.
+    """
+
+    def __init__(self, name, capacity, slot_size=64 * 1024, ctx=None):
+        ctx = ctx or mp.get_context()
+        self.name = name
+        self.capacity = capacity
+        self.slot_size = slot_size
+        self._stride = SLOT_HEADER.size + slot_size
+
+        self._shm = shared_memory.SharedMemory(
+            name=name, create=True, size=capacity * self._stride
+        )
+        self._owner = True
+        self._index = ctx.RawArray('Q', 2)
+        self._free = ctx.Semaphore(capacity)
+        self._filled = ctx.Semaphore(0)
+        self._put_lock = ctx.Lock()
+        self._get_lock = ctx.Lock()
+        self.reader, self._bell = ctx.Pipe(duplex=False)
+        os.set_blocking(self.reader.fileno(), False)
+        os.set_blocking(self._bell.fileno(), False)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_shm']
+        state['_owner'] = False
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._shm = _attach(self.name)
+
+    def put(self, obj, block=True, timeout=None):
+        blob = pack(obj)
+        flags = 0
+        if len(blob) > self.slot_size:
+            blob = self._spill(blob)
+            flags = SPILL_BIT
+        size = len(blob)
+
+        if not self._free.acquire(block, timeout):
+            if flags:
+                self._unspill(blob)  # Frees the spilled block
+            raise Full
+
+        buf = self._shm.buf
+        with self._put_lock:
+            head = self._index[HEAD]
+            offset = (head % self.capacity) * self._stride
+            SLOT_HEADER.pack_into(buf, offset, BUSY_BIT | size)
+            start = offset + SLOT_HEADER.size
+            buf[start:start + size] = blob
+            SLOT_HEADER.pack_into(buf, offset, flags | size)
+            self._index[HEAD] = head + 1
+
+        self._filled.release()
+        try:
+            os.write(self._bell.fileno(), b'\0')
+        except BlockingIOError:
+            pass  # Pipe full: a wakeup is already pending
+
+    def put_nowait(self, obj):
+        self.put(obj, block=False)
+
+    def get(self, block=True, timeout=None):
+        if not self._filled.acquire(block, timeout):
+            raise Empty
+
+        buf = self._shm.buf
+        with self._get_lock:
+            tail = self._index[TAIL]
+            offset = (tail % self.capacity) * self._stride
+            header, = SLOT_HEADER.unpack_from(buf, offset)
+            while header & BUSY_BIT:
+                header, = SLOT_HEADER.unpack_from(buf, offset)
+            start = offset + SLOT_HEADER.size
+            # Decode straight out of the slot; it is only handed back after this.
+            # The slot is consumed even if decoding fails so the ring stays in step
+            view = buf[start:start + (header & SIZE_MASK)]
+            try:
+                if header & SPILL_BIT:
+                    blob = bytes(view)
+                else:
+                    obj = unpack(view)
+            finally:
+                view.release()
+                self._index[TAIL] = tail + 1
+                self._free.release()
+
+        if header & SPILL_BIT:
+            return unpack(self._unspill(blob))
+        return obj
+
+    def _spill(self, blob):
+        shm = shared_memory.SharedMemory(create=True, size=len(blob))
+        shm.buf[:len(blob)] = blob
+        shm.close()
+        return pack([shm.name, len(blob)])
+
+    def _unspill(self, descriptor):
+        name, size = unpack(descriptor)
+        shm = _attach(name)
+        try:
+            return bytes(shm.buf[:size])
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def drain_bell(self):
+        try:
+            while os.read(self.reader.fileno(), 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def qsize(self):
+        return self._index[HEAD] - self._index[TAIL]
+
+    def empty(self):
+        return self.qsize() == 0
+
+    def close(self):
+        self.reader.close()
+        self._bell.close()
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+class PackedQueue(multiprocessing.queues.Queue):
+    """
+    mp.Queue that carries pack()ed bytes, so the feeder thread only
+    pickles a flat bytes object instead of the payload graph.
+    """
+
+    def __init__(self, maxsize=0, ctx=None):
+        super().__init__(maxsize, ctx=ctx or mp.get_context())
+
+    def put(self, obj, block=True, timeout=None):
+        super().put(pack(obj), block, timeout)
+
+    def get(self, block=True, timeout=None):
+        return unpack(super().get(block, timeout))
+
+
+def waitable(channel):
+    """
+    Object to pass to multiprocessing.connection.wait() for a channel
+    """
+    if isinstance(channel, ShmRing):
+        return channel.reader
+    return channel._reader
+
+
+def make_channel(name, capacity, slot_size=64 * 1024, ctx=None):
+    if shared_memory is None:
+        return PackedQueue(ctx=ctx)
+    return ShmRing(name, capacity, slot_size, ctx)
+
+
+STATE_FIELDS = {
+    'running': 0,
+    'memory_usage': 1,
+    'last_processed': 2,
+    'total_segments': 3,
+}
+
+
+class SharedState:
+    """
+    Fixed set of scalar counters in a ShareableList, addressed by name
+    so it can stand in for the old mp.Manager().dict().
+    """
+
+    def __init__(self, name=None):
+        if name is None:
+            self._list = shared_memory.ShareableList([True, 0.0, 0.0, 0])
+            self._owner = True
+        else:
+            self._list = shared_memory.ShareableList(name=name)
+            self._owner = False
+
+    def __getstate__(self):
+        return {'name': self._list.shm.name}
+
+    def __setstate__(self, state):
+        self.__init__(state['name'])
+
+    def __getitem__(self, key):
+        return self._list[STATE_FIELDS[key]]
+
+    def __setitem__(self, key, value):
+        self._list[STATE_FIELDS[key]] = value
+
+    def get(self, key, default=None):
+        if key not in STATE_FIELDS:
+            return default
+        return self[key]
+
+    def close(self):
+        self._list.shm.close()
+        if self._owner:
+            self._list.shm.unlink()
+
+
+def make_shared_state(ctx=None):
+    if shared_memory is None:
+        state = (ctx or mp.get_context()).Manager().dict()
+        state['running'] = True
+        state['memory_usage'] = 0.0
+        state['last_processed'] = 0.0
+        state['total_segments'] = 0
+        return state
+    return SharedState()
+
+
+class SharedConfig:
+    """
+    Config dict serialized once into a SharedMemory block. Pickles to
+    (name, size), so workers decode it from shared memory on attach.
+    """
+
+    def __init__(self, config):
+        blob = pack(config)
+        self.size = len(blob)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(self.size, 1))
+        self._shm.buf[:self.size] = blob
+        self.name = self._shm.name
+
+    def __getstate__(self):
+        return {'name': self.name, 'size': self.size}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._shm = None
+
+    def load(self):
+        shm = _attach(self.name)
+        try:
+            return unpack(bytes(shm.buf[:self.size]))
+        finally:
+            shm.close()
+
+    def close(self):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
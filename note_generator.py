@@ -4,27 +4,85 @@ Note Generator - Subprocess for AI-powered note generation
 Processes transcript segments and generates research notes
 """
 
+import atexit
+import io
 import logging
 import time
 import gc
 from datetime import datetime
 from collections import deque
+from itertools import islice
+from queue import Empty, Full
 from openai import OpenAI
 import httpx
 
+_PROMPTS = {k: v.strip() for k, v in {
+    'minimal': """
+    You are an assistant that creates minimal factual notes from a transcript.
+    Focus on WHAT was said, not WHY. Include:
+    - Direct statements made
+    - Actions mentioned
+    - Specific details shared
+    Format: [Time] TYPE: Content
+    """,
+    
+    'standard': """
+    You are an assistant that creates factual notes with minimal context.
+    Focus on WHAT happened:
+    - What participant said
+    - What participant did
+    - Specific details mentioned
+    - Light context only when essential
+    Format: [Time] TYPE: Content with brief context
+    """,
+    
+    'detailed': """
+    You are an assistant that creates detailed factual notes.
+    Include:
+    - Complete statements with context
+    - All actions and behaviors
+    - Specific details, numbers, brands
+    - Sequence of events
+    Format: [Time] TYPE: Comprehensive description
+    """,
+    
+    'comprehensive': """
+    You are an assistant that creates comprehensive documentation.
+    Capture everything:
+    - Every significant statement
+    - All behaviors and reactions
+    - Complete timeline
+    - Full verbatim quotes
+    - All specific details
+    Format: [Time] TYPE: Complete record with quotes
+    """
+}.items()}
+
 class NoteGenerator:
-    def __init__(self, config, input_queue, output_queue, shared_state, shutdown_event):
+    def __init__(self, config, input_queue, output_queue, shared_state, shutdown_event, ready_event=None):
         self.config = config
         self.input_queue = input_queue
         self.output_queue = output_queue
         self.shared_state = shared_state
         self.shutdown_event = shutdown_event
+        self.ready_event = ready_event
         
         self.setup_logging()
         self.setup_ai_client()
         
-        self.processing_buffer = deque(maxlen=50)
+        self._depth_level = config['note_taking']['depth_level']
+        self._log_to_file = bool(config['output']['log_to_file'])
+        self._notes_log_path = config['files']['notes_log']
+        
+        self.setup_notes_log()
+        
+        self._system_prompt = self.get_prompt_for_depth(self._depth_level)
+        self._last_batch_hash = None
+        self._deltas_sent = False
+        
         self.batch_timeout = 30
+        self.delta_interval = 0.25
+        self.max_memory_mb = config.get('architecture', {}).get('max_memory_mb', 500)
         self.min_batch_size = 5
         
     def setup_logging(self):
@@ -38,20 +96,31 @@ class NoteGenerator:
         if not api_key or api_key == "YOUR_DEEPSEEK_API_KEY_HERE":
             self.logger.warning("DeepSeek API key not configured - running in demo mode")
             self.client = None
+            self._httpx = None
             self.model_name = "demo-mode"
             self.max_tokens = 1500
             return
             
+        timeout = httpx.Timeout(
+            deepseek_cfg.get('timeout_connect', 15.0),
+            read=deepseek_cfg.get('timeout_read', 60.0),
+            write=deepseek_cfg.get('timeout_write', 10.0),
+            pool=deepseek_cfg.get('timeout_pool', 5.0)
+        )
+        limits = httpx.Limits(max_connections=4, max_keepalive_connections=4)
+        
+        try:
+            self._httpx = httpx.Client(http2=True, limits=limits, timeout=timeout)
+        except ImportError:
+            self.logger.warning("h2 not installed, DeepSeek client falling back to HTTP/1.1")
+            self._httpx = httpx.Client(limits=limits, timeout=timeout)
+            
         self.client = OpenAI(
             api_key=api_key,
             base_url=deepseek_cfg.get('base_url', "https://api.deepseek.com"),
             max_retries=deepseek_cfg.get('max_retries', 3),
-            timeout=httpx.Timeout(
-                deepseek_cfg.get('timeout_connect', 15.0),
-                read=deepseek_cfg.get('timeout_read', 60.0),
-                write=deepseek_cfg.get('timeout_write', 10.0),
-                pool=deepseek_cfg.get('timeout_pool', 5.0)
-            )
+            timeout=timeout,
+            http_client=self._httpx
         )
         
         self.model_name = deepseek_cfg.get('model', 'deepseek-chat')
@@ -60,69 +129,30 @@ class NoteGenerator:
         self.logger.info(f"AI client configured with model: {self.model_name}")
         
     def format_segments_for_ai(self, segments):
-        formatted_text = ""
-        
-        for segment in segments:
-            time_str = datetime.fromtimestamp(segment['start']).strftime('%H:%M:%S')
-            formatted_text += f"[{time_str}] {segment['text']}\n"
-            
-        return formatted_text.strip()
+        return "\n".join(
+            f"[{time.strftime('%H:%M:%S', time.localtime(segment['start']))}] {segment['text']}"
+            for segment in segments
+            if segment['text'].strip()
+        )
         
     def get_prompt_for_depth(self, depth_level):
-        prompts = {
-            'minimal': """
-            You are an assistant that creates minimal factual notes from a transcript.
-            Focus on WHAT was said, not WHY. Include:
-            - Direct statements made
-            - Actions mentioned
-            - Specific details shared
-            Format: [Time] TYPE: Content
-            """,
-            
-            'standard': """
-            You are an assistant that creates factual notes with minimal context.
-            Focus on WHAT happened:
-            - What participant said
-            - What participant did
-            - Specific details mentioned
-            - Light context only when essential
-            Format: [Time] TYPE: Content with brief context
-            """,
-            
-            'detailed': """
-            You are an assistant that creates detailed factual notes.
-            Include:
-            - Complete statements with context
-            - All actions and behaviors
-            - Specific details, numbers, brands
-            - Sequence of events
-            Format: [Time] TYPE: Comprehensive description
-            """,
-            
-            'comprehensive': """
-            You are an assistant that creates comprehensive documentation.
-            Capture everything:
-            - Every significant statement
-            - All behaviors and reactions
-            - Complete timeline
-            - Full verbatim quotes
-            - All specific details
-            Format: [Time] TYPE: Complete record with quotes
-            """
-        }
-        
-        return prompts.get(depth_level, prompts['standard'])
+        return _PROMPTS.get(depth_level, _PROMPTS['standard'])
         
     def generate_notes(self, segments):
         if not segments:
             return None
             
-        depth_level = self.config['note_taking']['depth_level']
+        depth_level = self._depth_level
         formatted_text = self.format_segments_for_ai(segments)
         
         if not formatted_text:
             return None
             
+        batch_hash = hash(formatted_text)
+        if batch_hash == self._last_batch_hash:
+            self.logger.info(f"Skipping batch of {len(segments)} segments identical to the last one")
+            return None
+            
         # Demo mode if no client
         if not self.client:
             self.logger.info(f"Demo mode: Would generate {depth_level} notes for {len(segments)} segments")
@@ -130,16 +160,15 @@ class NoteGenerator:
             demo_notes += f"Depth: {depth_level}\n"
             demo_notes += f"Segments: {len(segments)}\n"
             demo_notes += f"-"*40 + "\n"
-            for seg in segments[:3]:  # Show first 3 segments
+            for seg in islice(segments, 3):  # Show first 3 segments
                 time_str = datetime.fromtimestamp(seg['start']).strftime('%H:%M:%S')
                 demo_notes += f"[{time_str}] {seg['text'][:50]}...\n"
             demo_notes += f"\n(Configure DeepSeek API key in config.yaml for actual notes)"
+            self._last_batch_hash = batch_hash
             return demo_notes
             
-        system_prompt = self.get_prompt_for_depth(depth_level)
-        
         messages = [
-            {"role": "system", "content": system_prompt.strip()},
+            {"role": "system", "content": self._system_prompt},
             {"role": "user", "content": formatted_text}
         ]
         
@@ -149,92 +178,169 @@ class NoteGenerator:
             response = self.client.chat.completions.create(
                 model=self.model_name,
                 messages=messages,
-                stream=False,
+                stream=True,
                 max_tokens=self.max_tokens
             )
             
-            notes = response.choices[0].message.content
+            notes_buf = io.StringIO()
+            pending = []
+            self._deltas_sent = False
+            last_forward = time.time()
+            
+            for chunk in response:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                    
+                notes_buf.write(delta)
+                pending.append(delta)
+                
+                if time.time() - last_forward >= self.delta_interval:
+                    if self.forward_notes_delta(pending):
+                        pending = []
+                    last_forward = time.time()
+                    
+            if pending:
+                self.forward_notes_delta(pending)
+                
+            notes = notes_buf.getvalue()
             
             if not notes:
                 self.logger.warning("AI returned empty notes")
                 return None
                 
+            self._last_batch_hash = batch_hash
             return notes
             
         except Exception as e:
             self.logger.error(f"Failed to generate notes: {e}")
             return None
             
+    def forward_notes_delta(self, pending):
+        # The first delta of a generation tells the UI to drop any stale partial text
+        message = {'notes_delta': "".join(pending)}
+        if not self._deltas_sent:
+            message['notes_start'] = True
+        try:
+            self.output_queue.put_nowait(message)
+            self._deltas_sent = True
+            return True
+        except Full:
+            return False
+            
+    def abort_live_notes(self):
+        try:
+            self.output_queue.put({'notes_abort': True}, timeout=5)
+        except Full:
+            self.logger.warning("Failed to clear partial notes in the UI")
+        
     def process_batch(self, segments):
         notes = self.generate_notes(segments)
+        delivered = False
         
         if notes:
             output_data = {
                 'notes': notes,
                 'timestamp': datetime.now().isoformat(),
                 'segment_count': len(segments),
-                'depth_level': self.config['note_taking']['depth_level']
+                'depth_level': self._depth_level
             }
             
             try:
                 self.output_queue.put(output_data, timeout=5)
+                delivered = True
                 self.logger.info(f"Generated notes for {len(segments)} segments")
                 
-                if self.config['output']['log_to_file']:
+                if self._log_to_file:
                     self.log_notes_to_file(notes)
                     
             except Exception as e:
                 self.logger.error(f"Failed to queue notes: {e}")
                 
-        gc.collect()
+        # Streaming failed, came back empty or the final put failed: no 'notes' message follows
+        if self._deltas_sent and not delivered:
+            self.abort_live_notes()
+        self._deltas_sent = False
         
-    def log_notes_to_file(self, notes):
-        log_file = self.config['files']['notes_log']
+        if self.shared_state.get('memory_usage', 0) > self.max_memory_mb:
+            gc.collect(generation=1)
+        
+    def setup_notes_log(self):
+        self._log_fh = None
         
+        if not self._log_to_file:
+            return
+            
         try:
-            with open(log_file, 'a', encoding='utf-8') as f:
-                f.write(f"\n\n{'='*80}\n")
-                f.write(f"RESEARCH NOTES - {datetime.now().isoformat()}\n")
-                f.write(f"{'-'*80}\n")
-                f.write(notes)
-                f.write(f"\n{'='*80}\n")
-                
-            self.logger.info(f"Notes logged to {log_file}")
+            self._log_fh = open(self._notes_log_path, 'a', encoding='utf-8', buffering=1 << 16)
+            atexit.register(self.close_notes_log)
+        except IOError as e:
+            self.logger.error(f"Failed to open notes log: {e}")
+            
+    def close_notes_log(self):
+        if self._log_fh and not self._log_fh.closed:
+            self._log_fh.close()
+            
+    def log_notes_to_file(self, notes):
+        if not self._log_fh:
+            return
+            
+        try:
+            self._log_fh.writelines([
+                f"\n\n{'='*80}\n",
+                f"RESEARCH NOTES - {datetime.now().isoformat()}\n",
+                f"{'-'*80}\n",
+                notes,
+                f"\n{'='*80}\n"
+            ])
+            self._log_fh.flush()
+            
+            self.logger.info(f"Notes logged to {self._notes_log_path}")
             
         except IOError as e:
             self.logger.error(f"Failed to log notes to file: {e}")
             
     def run(self):
         self.logger.info("Note Generator started")
-        self.logger.info(f"Depth level: {self.config['note_taking']['depth_level']}")
+        self.logger.info(f"Depth level: {self._depth_level}")
+        
+        if self.ready_event:
+            self.ready_event.set()
         
-        last_batch_time = time.time()
-        current_batch = []
+        deadline = time.time() + self.batch_timeout
+        current_batch = deque()
+        drain_limit = self.min_batch_size * 2
         
         while not self.shutdown_event.is_set():
             try:
-                timeout = max(1, self.batch_timeout - (time.time() - last_batch_time))
-                
                 try:
-                    data = self.input_queue.get(timeout=timeout)
+                    data = self.input_queue.get(timeout=max(1, deadline - time.time()))
+                    received = len(current_batch)
+                    current_batch.extend(data.get('segments', []))
                     
-                    if data and 'segments' in data:
-                        current_batch.extend(data['segments'])
-                        self.logger.info(f"Received {len(data['segments'])} segments")
-                        
-                        if len(current_batch) >= self.min_batch_size:
-                            self.process_batch(current_batch)
-                            current_batch = []
-                            last_batch_time = time.time()
+                    while len(current_batch) < drain_limit:
+                        try:
+                            current_batch.extend(self.input_queue.get_nowait().get('segments', []))
+                        except Empty:
+                            break
                             
-                except:
+                    self.logger.info(f"Received {len(current_batch) - received} segments")
+                    
+                    if len(current_batch) >= self.min_batch_size:
+                        self.process_batch(current_batch)
+                        current_batch.clear()
+                        deadline = time.time() + self.batch_timeout
+                        
+                except Empty:
                     pass
                     
-                if current_batch and (time.time() - last_batch_time) > self.batch_timeout:
+                if current_batch and time.time() > deadline:
                     self.logger.info(f"Processing batch due to timeout ({len(current_batch)} segments)")
                     self.process_batch(current_batch)
-                    current_batch = []
-                    last_batch_time = time.time()
+                    current_batch.clear()
+                    deadline = time.time() + self.batch_timeout
                     
             except Exception as e:
                 self.logger.error(f"Error in generator loop: {e}", exc_info=True)
@@ -244,18 +350,22 @@ class NoteGenerator:
             self.logger.info(f"Processing final batch ({len(current_batch)} segments)")
             self.process_batch(current_batch)
             
+        self.close_notes_log()
+        if self._httpx:
+            self._httpx.close()
         self.logger.info("Note Generator shutting down")
         
 if __name__ == "__main__":
     import yaml
     import multiprocessing as mp
+    from ipc import make_shared_state
     
     with open('config.yaml', 'r') as f:
         config = yaml.safe_load(f)
         
     input_queue = mp.Queue()
     output_queue = mp.Queue()
-    shared_state = mp.Manager().dict()
+    shared_state = make_shared_state()
     shutdown_event = mp.Event()
     
     generator = NoteGenerator(config, input_queue, output_queue, shared_state, shutdown_event)
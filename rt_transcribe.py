@@ -8,6 +8,16 @@ from openai import OpenAI, APIConnectionError, RateLimitError, APIStatusError, A
 import httpx
 import threading
 import traceback
+import logging
+import functools
+import shlex
+import tempfile
+import atexit
+import bisect
+from concurrent.futures import ThreadPoolExecutor
+
+# Expected API failures are logged without a traceback; unexpected ones keep it
+log = logging.getLogger("rt_transcribe")
 
 # Import and initialize Colorama
 try:
@@ -24,6 +34,117 @@ except ImportError:
     Fore = Style = Back = DummyColor()
     USE_COLORAMA = False
 
+# libyaml's C loader is much faster than the pure-Python SafeLoader when available
+try:
+    from yaml import CSafeLoader as _YLoader
+except ImportError:
+    from yaml import SafeLoader as _YLoader
+
+# Prefer orjson for parsing transcript files; stdlib json is the fallback
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# Large transcript files are streamed record-by-record with ijson if installed
+try:
+    import ijson
+    JSON_ERRORS = (json.JSONDecodeError, ijson.JSONError)
+except ImportError:
+    ijson = None
+    JSON_ERRORS = (json.JSONDecodeError,)
+STREAM_PARSE_THRESHOLD = 10 * 1024 * 1024
+
+# numpy keeps parsed start times in a packed float64 array when installed
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# ciso8601 parses ISO-8601 timestamps in C; datetime.fromisoformat is the fallback
+try:
+    from ciso8601 import parse_datetime
+except ImportError:
+    parse_datetime = datetime.fromisoformat
+
+# Per-request caps when a backlog of segments is sent to DeepSeek
+MAX_BATCH_SEGMENTS = 200
+MAX_BATCH_CHARS = 12000
+MAX_BATCH_WORKERS = 4
+
+@functools.lru_cache(maxsize=4096)
+def _iso_to_epoch(iso_timestamp_str):
+    return parse_datetime(iso_timestamp_str).timestamp()
+
+# --- Note Generation Prompts (Unchanged from previous DeepSeek version) ---
+_SYS_MINIMAL = """
+    You are an assistant that creates minimal factual notes from a transcript.
+    Capture WHAT was said, not WHY. Focus on:
+    - Direct statements made
+    - Actions mentioned
+    - Specific details shared
+    - Brief quotes
+    Format the notes as follows, using the timestamps from the provided transcript text:
+    [Time] STATED: What participant said
+    [Time] ACTION: What participant did
+    [Time] DETAIL: Specific fact mentioned
+    Provide NO analysis or interpretation. Just facts for researcher reference.
+    """.strip()
+
+_SYS_STANDARD = """
+    You are an assistant that creates factual notes with minimal context from a transcript.
+    Focus on WHAT happened:
+    - What participant said (verbatim when significant)
+    - What participant did (behaviors, actions)
+    - Specific details, numbers, names mentioned
+    - Light context only when essential for clarity
+    Format the notes as follows, using the timestamps from the provided transcript text:
+    [Time] SAID: Direct statement or paraphrase
+    [Time] DID: Action or behavior described
+    [Time] MENTIONED: Specific detail, number, brand, etc.
+    [Time] CONTEXT: Minimal situational detail (only if needed)
+    Keep interpretation to an absolute minimum. Facts first.
+    """.strip()
+
+_SYS_DETAILED = """
+    You are an assistant that creates detailed factual notes from a transcript.
+    Focus on comprehensive WHAT without heavy WHY:
+    - Complete statements with context
+    - All actions and behaviors mentioned
+    - Specific details, numbers, brands, timelines
+    - Full quotes when significant
+    - Sequence of events as described
+    - Light analysis only for immediate clarity
+    Format the notes as follows, using the timestamps from the provided transcript text:
+    [Time] STATEMENT: Complete description of what was said
+    [Time] BEHAVIOR: Full description of actions taken
+    [Time] DETAILS: Specific facts, figures, brands mentioned
+    [Time] SEQUENCE: Order of events as described
+    [Time] QUOTE: "Full verbatim statement" - brief context note
+    Provide comprehensive facts with minimal interpretation.
+    """.strip()
+
+_SYS_COMPREHENSIVE = """
+    You are an assistant that creates comprehensive factual documentation from a transcript.
+    Focus on:
+    - Every significant statement made
+    - All behaviors, actions, and reactions described
+    - Complete timeline and sequence of events
+    - All specific details: numbers, brands, people, places
+    - Full verbatim quotes
+    - Situational context provided by participant
+    - Process descriptions as given
+    - Minimal analysis - only for factual clarity
+    Format the notes as follows, using the timestamps from the provided transcript text:
+    [Time] VERBATIM: "Complete quote as stated"
+    [Time] DESCRIBED: Full description of situation/process as explained
+    [Time] REPORTED: Actions, behaviors, or events participant reported
+    [Time] SPECIFIED: Exact details, numbers, brands, timelines mentioned
+    [Time] CONTEXT: Situational background provided by participant
+    Provide a complete factual record for thorough analysis later.
+    """.strip()
+
 class TranscriptMonitor:
     def __init__(self, config_path="config.yaml"):
         print(Fore.CYAN + f"Attempting to load configuration from: {config_path}")
@@ -32,7 +153,7 @@ class TranscriptMonitor:
             raise FileNotFoundError(f"Configuration file '{config_path}' not found.")
             
         with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+            self.config = yaml.load(f, Loader=_YLoader)
         
         deepseek_cfg = self.config.get('deepseek', {})
         api_key_value = deepseek_cfg.get('api_key')
@@ -41,18 +162,55 @@ class TranscriptMonitor:
             print(Fore.YELLOW + "Please set your deepseek.api_key in the configuration file.")
             raise ValueError("DeepSeek API key not configured.")
 
+        timeout = httpx.Timeout(
+            deepseek_cfg.get('timeout_connect', 15.0),
+            read=deepseek_cfg.get('timeout_read', 60.0),
+            write=deepseek_cfg.get('timeout_write', 10.0),
+            pool=deepseek_cfg.get('timeout_pool', 5.0)
+        )
+        # One long-lived connection is reused across ticks, so keep it alive between checks
+        limits = httpx.Limits(max_keepalive_connections=4, keepalive_expiry=3600.0)
+        try:
+            self._httpx = httpx.Client(http2=True, limits=limits, timeout=timeout)
+        except ImportError:
+            print(Fore.YELLOW + "Warning: h2 not installed, DeepSeek client falling back to HTTP/1.1. Install with: pip install 'httpx[http2]'")
+            self._httpx = httpx.Client(limits=limits, timeout=timeout)
+
         self.client = OpenAI(
             api_key=api_key_value,
             base_url=deepseek_cfg.get('base_url', "https://api.deepseek.com"),
             max_retries=deepseek_cfg.get('max_retries', 3), 
-            timeout=httpx.Timeout(
-                deepseek_cfg.get('timeout_connect', 15.0),
-                read=deepseek_cfg.get('timeout_read', 60.0),
-                write=deepseek_cfg.get('timeout_write', 10.0),
-                pool=deepseek_cfg.get('timeout_pool', 5.0)
-            )
+            timeout=timeout,
+            http_client=self._httpx
         )
+        self.last_offset = 0 # Byte offset already consumed in the JSONL sidecar
+        self._pending_offset = 0
+        self._jsonl_path = None
+        self._last_saved_content = None
+        self._last_saved_offset = None
+        self._cached_starts = [] # Last parse of the JSON transcript, keyed by path/mtime/size
+        self._cached_texts = []
+        self._cached_path = None
+        self._cached_mtime = None
+        self._cached_size = None
+        self._generation_thread = None
+        self._echo_deltas = not self.config['output']['new_terminal']
+        self._latest_path_cache = None # Resolved transcript path, valid while both dir mtimes match
+        self._base_mtime = 0
+        self._session_mtime = 0
+        self._depth_level = self.config['note_taking']['depth_level']
+        self._notes_fn = {
+            "minimal": self.get_minimal_notes,
+            "standard": self.get_standard_notes,
+            "detailed": self.get_detailed_notes,
+            "comprehensive": self.get_comprehensive_notes
+        }.get(self._depth_level)
+        if self._notes_fn is None:
+            print(Fore.YELLOW + f"Warning: Unknown depth_level '{self._depth_level}'. Defaulting to 'standard'.")
+            self._notes_fn = self.get_standard_notes
         self.last_processed_time = self.load_last_processed_time()
+        self.load_jsonl_offset()
+        self.setup_notes_log()
         
         print(Fore.GREEN + "Transcript Monitor initialized successfully (using DeepSeek API via OpenAI SDK).")
         print(Fore.BLUE + f" - DeepSeek Model: {deepseek_cfg.get('model', 'deepseek-chat')}")
@@ -80,23 +238,74 @@ class TranscriptMonitor:
         print(Fore.YELLOW + f"Processed log file '{log_file}' not found. Starting from beginning.")
         return 0.0
 
+    def jsonl_offset_file(self):
+        # Kept apart from processed_log, which transcript_monitor also reads as a bare float
+        return self.config['files']['processed_log'] + ".offset"
+
+    def load_jsonl_offset(self):
+        try:
+            with open(self.jsonl_offset_file(), 'r') as f:
+                offset, path = f.read().split('\n', 1)
+            self.last_offset = int(offset)
+            self._jsonl_path = path
+        except FileNotFoundError:
+            pass
+        except ValueError:
+            print(Fore.YELLOW + f"Warning: Could not parse JSONL offset from {self.jsonl_offset_file()}. Starting from beginning.")
+
+    def replace_file(self, path, content):
+        # Write then rename, so a crash never leaves a truncated file behind
+        fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix='.' + os.path.basename(path) + '.')
+        try:
+            # mkstemp creates 0600; keep the file's existing mode (0644 for a new one)
+            try:
+                mode = os.stat(path).st_mode & 0o777
+            except FileNotFoundError:
+                mode = 0o644
+            os.fchmod(fd, mode)
+            with os.fdopen(fd, 'w') as f:
+                f.write(content)
+            os.replace(tmp_file, path)
+        except BaseException:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            raise
+
     def save_last_processed_time(self, timestamp_float):
         log_file = self.config['files']['processed_log']
+        content = str(timestamp_float)
         try:
-            with open(log_file, 'w') as f:
-                f.write(str(timestamp_float))
+            if content != self._last_saved_content: # Skip when nothing changed since the last save
+                self.replace_file(log_file, content)
+                self._last_saved_content = content
+            if self._jsonl_path:
+                offset_content = f"{self.last_offset}\n{self._jsonl_path}"
+                if offset_content != self._last_saved_offset:
+                    self.replace_file(self.jsonl_offset_file(), offset_content)
+                    self._last_saved_offset = offset_content
         except Exception as e:
             print(Fore.RED + f"Error saving last processed time to '{log_file}': {e}")
 
 
     def get_latest_transcript_file_path(self):
         base_transcript_dir = self.config['files']['transcript_path']
+        # Directory mtimes only move when entries are added/removed, so reuse the last scan until then
+        if self._latest_path_cache is not None:
+            try:
+                if (os.stat(base_transcript_dir).st_mtime == self._base_mtime
+                        and os.stat(os.path.dirname(self._latest_path_cache)).st_mtime == self._session_mtime):
+                    return self._latest_path_cache
+            except FileNotFoundError:
+                pass
+            self._latest_path_cache = None
         if not os.path.isdir(base_transcript_dir): 
             # This can be normal if rt_transcribe hasn't run yet or created the dir
             # print(Fore.YELLOW + f"Warning: Base transcript directory not found or not a directory: {base_transcript_dir}")
             return None
         try:
-            session_dirs = [d for d in os.listdir(base_transcript_dir) if os.path.isdir(os.path.join(base_transcript_dir, d)) and d.startswith("session_")]
+            base_mtime = os.stat(base_transcript_dir).st_mtime
+            with os.scandir(base_transcript_dir) as entries:
+                session_dirs = [e.name for e in entries if e.name.startswith("session_") and e.is_dir()]
         except FileNotFoundError: return None # Base dir disappeared
         if not session_dirs: return None # No session subdirectories yet
         
@@ -104,153 +313,145 @@ class TranscriptMonitor:
         latest_session_path = os.path.join(base_transcript_dir, latest_session_dir_name)
         
         try:
-            transcript_json_files = [f for f in os.listdir(latest_session_path) if f.startswith("transcript_chunks_") and f.endswith(".json")]
+            session_mtime = os.stat(latest_session_path).st_mtime
+            with os.scandir(latest_session_path) as entries:
+                transcript_json_files = [e.name for e in entries if e.name.startswith("transcript_chunks_") and e.name.endswith((".json", ".jsonl"))]
         except FileNotFoundError:
             print(Fore.YELLOW + f"Warning: Latest session directory '{latest_session_path}' disappeared unexpectedly.")
             return None
         if not transcript_json_files: 
             # print(Fore.YELLOW + f"No transcript_chunks JSON file found in latest session: {latest_session_path}") # Can be noisy
             return None
-        return os.path.join(latest_session_path, transcript_json_files[0]) # Assuming one such file
+        # Prefer an append-only JSONL sidecar, which can be tailed instead of re-parsed
+        transcript_json_files.sort(key=lambda f: not f.endswith(".jsonl"))
+        self._latest_path_cache = os.path.join(latest_session_path, transcript_json_files[0]) # Assuming one such file
+        self._base_mtime = base_mtime
+        self._session_mtime = session_mtime
+        return self._latest_path_cache
+
+    def iter_new_jsonl_chunks(self, path_to_jsonl):
+        if path_to_jsonl != self._jsonl_path:
+            self._jsonl_path = path_to_jsonl
+            self.last_offset = 0
+        offset = self._pending_offset = self.last_offset
+        with open(path_to_jsonl, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < offset: # Truncated or replaced
+                offset = 0
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'): break # Record still being written
+                offset += len(line)
+                self._pending_offset = offset
+                if line.strip():
+                    yield json_loads(line)
+
+    def iter_transcript_chunks(self, path_to_transcript_json):
+        if path_to_transcript_json.endswith(".jsonl"):
+            yield from self.iter_new_jsonl_chunks(path_to_transcript_json)
+            return
+        # Stream big files so only one chunk dict is alive at a time
+        if ijson is not None and os.path.getsize(path_to_transcript_json) > STREAM_PARSE_THRESHOLD:
+            with open(path_to_transcript_json, 'rb') as f:
+                yield from ijson.items(f, 'item', use_float=True)
+            return
+            
+        with open(path_to_transcript_json, 'rb') as f:
+            all_segments_from_file = json_loads(f.read())
+        if not isinstance(all_segments_from_file, list):
+            print(Fore.YELLOW + f"Warning: Transcript file {path_to_transcript_json} is not a list as expected by the script.")
+            return
+        yield from all_segments_from_file
+
+    def parse_transcript_segments(self, path_to_transcript_json):
+        # Struct-of-arrays: parallel start times and texts, both in chronological order
+        starts, texts = [], []
+        for live_chunk_data in self.iter_transcript_chunks(path_to_transcript_json):
+            iso_timestamp_str = live_chunk_data.get('timestamp')
+            raw_text = live_chunk_data.get('raw_transcript')
+            if not iso_timestamp_str or raw_text is None: continue # Skip if essential data missing
+            
+            try:
+                segment_start_epoch_float = _iso_to_epoch(iso_timestamp_str)
+            except ValueError:
+                print(Fore.YELLOW + f"Warning: Could not parse ISO timestamp '{iso_timestamp_str}' for chunk ID {live_chunk_data.get('chunk_id', 'N/A')}. Skipping.")
+                continue
+            
+            starts.append(segment_start_epoch_float)
+            texts.append(raw_text)
+        
+        # Ensure chronological order
+        if np is not None:
+            starts = np.fromiter(starts, dtype=np.float64, count=len(starts))
+            order = np.argsort(starts, kind='stable')
+            return starts[order], [texts[i] for i in order]
+        order = sorted(range(len(starts)), key=starts.__getitem__)
+        return [starts[i] for i in order], [texts[i] for i in order]
+
+    def get_parsed_segments(self, path_to_transcript_json):
+        if path_to_transcript_json.endswith(".jsonl"): # Already only reads the new tail
+            return self.parse_transcript_segments(path_to_transcript_json)
+        # The JSON array is rewritten in place, so reuse the last parse until it changes
+        st = os.stat(path_to_transcript_json)
+        if (path_to_transcript_json == self._cached_path and st.st_mtime == self._cached_mtime
+                and st.st_size == self._cached_size):
+            return self._cached_starts, self._cached_texts
+        self._cached_starts, self._cached_texts = self.parse_transcript_segments(path_to_transcript_json)
+        self._cached_path = path_to_transcript_json
+        self._cached_mtime = st.st_mtime
+        self._cached_size = st.st_size
+        return self._cached_starts, self._cached_texts
 
     def get_recent_transcript_segments(self):
         path_to_transcript_json = self.get_latest_transcript_file_path()
         if not path_to_transcript_json: return []
         
         try:
-            with open(path_to_transcript_json, 'r', encoding='utf-8') as f:
-                all_segments_from_file = json.load(f)
-            
-            recent_segments_for_notes = []
-            if not isinstance(all_segments_from_file, list):
-                print(Fore.YELLOW + f"Warning: Transcript file {path_to_transcript_json} is not a list as expected by the script.")
-                return []
-
-            for live_chunk_data in all_segments_from_file:
-                iso_timestamp_str = live_chunk_data.get('timestamp')
-                raw_text = live_chunk_data.get('raw_transcript')
-                if not iso_timestamp_str or raw_text is None: continue # Skip if essential data missing
-                
-                try:
-                    dt_object = datetime.fromisoformat(iso_timestamp_str)
-                    segment_start_epoch_float = dt_object.timestamp()
-                except ValueError:
-                    print(Fore.YELLOW + f"Warning: Could not parse ISO timestamp '{iso_timestamp_str}' for chunk ID {live_chunk_data.get('chunk_id', 'N/A')}. Skipping.")
-                    continue
-                
-                if segment_start_epoch_float > self.last_processed_time:
-                    recent_segments_for_notes.append({'start': segment_start_epoch_float, 'text': raw_text})
-            
-            recent_segments_for_notes.sort(key=lambda x: x['start']) # Ensure chronological order
-            return recent_segments_for_notes
+            starts, texts = self.get_parsed_segments(path_to_transcript_json)
+            # Starts are sorted, so everything after the last processed time is one slice
+            first_new = bisect.bisect_right(starts, self.last_processed_time)
+            return [{'start': float(starts[i]), 'text': texts[i]} for i in range(first_new, len(texts))]
             
         except FileNotFoundError: 
             # print(Fore.YELLOW + f"Transcript file not found during read attempt: {path_to_transcript_json}") # Can be noisy
             return []
-        except json.JSONDecodeError as e:
+        except JSON_ERRORS as e:
             print(Fore.RED + f"Error decoding JSON from transcript file '{path_to_transcript_json}': {e}")
             return []
-        except Exception as e_general:
-            print(Fore.RED + f"An unexpected error occurred while getting recent transcript segments from '{path_to_transcript_json}':")
-            traceback.print_exc()
+        except Exception:
+            log.exception("Unexpected error while getting recent transcript segments from '%s'", path_to_transcript_json)
             return []
 
     def format_transcript_for_ai(self, segments_for_notes):
         if not segments_for_notes: return None
-        transcript_text_for_prompt = ""
+        precision = self.config['format']['timestamp_precision']
+        time_format = '%H:%M:%S' if precision == 'second' else '%H:%M'
+        prompt_lines = []
         for segment in segments_for_notes:
-            segment_epoch_time = segment['start']
-            segment_text = segment['text']
-            precision = self.config['format']['timestamp_precision']
-            time_format = '%H:%M:%S' if precision == 'second' else '%H:%M'
-            formatted_timestamp = datetime.fromtimestamp(segment_epoch_time).strftime(time_format)
-            transcript_text_for_prompt += f"[{formatted_timestamp}] {segment_text}\n"
-        return transcript_text_for_prompt.strip()
+            formatted_timestamp = time.strftime(time_format, time.localtime(segment['start']))
+            prompt_lines.append(f"[{formatted_timestamp}] {segment['text']}")
+        return "\n".join(prompt_lines).rstrip()
 
     def _prepare_messages_for_deepseek(self, system_instructions: str, user_input_text: str):
         return [
-            {"role": "system", "content": system_instructions.strip()},
+            {"role": "system", "content": system_instructions}, # Prompts are pre-stripped constants
             {"role": "user", "content": user_input_text.strip()}
         ]
 
-    # --- Note Generation Prompts (Unchanged from previous DeepSeek version) ---
+    # --- Note Generation (prompts are the module-level _SYS_* constants) ---
     def get_minimal_notes(self, transcript_text):
-        system_instructions = """
-        You are an assistant that creates minimal factual notes from a transcript.
-        Capture WHAT was said, not WHY. Focus on:
-        - Direct statements made
-        - Actions mentioned
-        - Specific details shared
-        - Brief quotes
-        Format the notes as follows, using the timestamps from the provided transcript text:
-        [Time] STATED: What participant said
-        [Time] ACTION: What participant did
-        [Time] DETAIL: Specific fact mentioned
-        Provide NO analysis or interpretation. Just facts for researcher reference.
-        """
-        messages = self._prepare_messages_for_deepseek(system_instructions, transcript_text)
+        messages = self._prepare_messages_for_deepseek(_SYS_MINIMAL, transcript_text)
         return self.call_deepseek(messages=messages)
     
     def get_standard_notes(self, transcript_text):
-        system_instructions = """
-        You are an assistant that creates factual notes with minimal context from a transcript.
-        Focus on WHAT happened:
-        - What participant said (verbatim when significant)
-        - What participant did (behaviors, actions)
-        - Specific details, numbers, names mentioned
-        - Light context only when essential for clarity
-        Format the notes as follows, using the timestamps from the provided transcript text:
-        [Time] SAID: Direct statement or paraphrase
-        [Time] DID: Action or behavior described
-        [Time] MENTIONED: Specific detail, number, brand, etc.
-        [Time] CONTEXT: Minimal situational detail (only if needed)
-        Keep interpretation to an absolute minimum. Facts first.
-        """
-        messages = self._prepare_messages_for_deepseek(system_instructions, transcript_text)
+        messages = self._prepare_messages_for_deepseek(_SYS_STANDARD, transcript_text)
         return self.call_deepseek(messages=messages)
 
     def get_detailed_notes(self, transcript_text):
-        system_instructions = """
-        You are an assistant that creates detailed factual notes from a transcript.
-        Focus on comprehensive WHAT without heavy WHY:
-        - Complete statements with context
-        - All actions and behaviors mentioned
-        - Specific details, numbers, brands, timelines
-        - Full quotes when significant
-        - Sequence of events as described
-        - Light analysis only for immediate clarity
-        Format the notes as follows, using the timestamps from the provided transcript text:
-        [Time] STATEMENT: Complete description of what was said
-        [Time] BEHAVIOR: Full description of actions taken
-        [Time] DETAILS: Specific facts, figures, brands mentioned
-        [Time] SEQUENCE: Order of events as described
-        [Time] QUOTE: "Full verbatim statement" - brief context note
-        Provide comprehensive facts with minimal interpretation.
-        """
-        messages = self._prepare_messages_for_deepseek(system_instructions, transcript_text)
+        messages = self._prepare_messages_for_deepseek(_SYS_DETAILED, transcript_text)
         return self.call_deepseek(messages=messages)
 
     def get_comprehensive_notes(self, transcript_text):
-        system_instructions = """
-        You are an assistant that creates comprehensive factual documentation from a transcript.
-        Focus on:
-        - Every significant statement made
-        - All behaviors, actions, and reactions described
-        - Complete timeline and sequence of events
-        - All specific details: numbers, brands, people, places
-        - Full verbatim quotes
-        - Situational context provided by participant
-        - Process descriptions as given
-        - Minimal analysis - only for factual clarity
-        Format the notes as follows, using the timestamps from the provided transcript text:
-        [Time] VERBATIM: "Complete quote as stated"
-        [Time] DESCRIBED: Full description of situation/process as explained
-        [Time] REPORTED: Actions, behaviors, or events participant reported
-        [Time] SPECIFIED: Exact details, numbers, brands, timelines mentioned
-        [Time] CONTEXT: Situational background provided by participant
-        Provide a complete factual record for thorough analysis later.
-        """
-        messages = self._prepare_messages_for_deepseek(system_instructions, transcript_text)
+        messages = self._prepare_messages_for_deepseek(_SYS_COMPREHENSIVE, transcript_text)
         return self.call_deepseek(messages=messages)
 
     def call_deepseek(self, messages: list):
@@ -268,114 +469,160 @@ class TranscriptMonitor:
                 print(Fore.YELLOW + f"[{current_time_str}] No user input text provided to DeepSeek. Skipping API call.")
                 return "Error: No transcript text provided for note generation."
 
-            response = self.client.chat.completions.create(
+            response_stream = self.client.chat.completions.create(
                 model=model_name,
                 messages=messages,
-                stream=False,
+                stream=True,
                 max_tokens=max_tokens_completion 
             )
             
-            generated_notes = response.choices[0].message.content
+            # Without a new terminal, echo tokens to the console as they arrive
+            echo_to_console = self._echo_deltas
+            note_parts = []
+            for chunk in response_stream:
+                if not chunk.choices: continue
+                delta = chunk.choices[0].delta.content
+                if not delta: continue
+                if echo_to_console:
+                    if not note_parts:
+                        print(Fore.YELLOW + "\n" + "="*60 + Style.BRIGHT + "\nRESEARCH NOTES (Streaming)" + Style.NORMAL + "\n" + "="*60)
+                    print(delta, end='', flush=True)
+                note_parts.append(delta)
+            if echo_to_console and note_parts:
+                print("\n" + "="*60)
+            
+            generated_notes = "".join(note_parts)
             print(Fore.GREEN + f"[{current_time_str}] DeepSeek API call successful.")
             if not generated_notes:
                  print(Fore.YELLOW + f"[{current_time_str}] Warning: DeepSeek returned empty content.")
                  return "Warning: DeepSeek returned empty notes."
             return generated_notes
         except APITimeoutError as e:
-            print(Fore.RED + f"DeepSeek API Request Timed Out: {e}")
-            traceback.print_exc()
+            log.warning("DeepSeek API request timed out: %s", e)
             return f"Error (Timeout): DeepSeek API request timed out. Details: {e}"
         except APIConnectionError as e:
-            print(Fore.RED + f"DeepSeek API Connection Error: {e}")
-            traceback.print_exc()
+            log.warning("DeepSeek API connection error: %s", e)
             return f"Error (Connection): Could not connect to DeepSeek API. Details: {e}"
         except RateLimitError as e:
-            print(Fore.RED + f"DeepSeek API Rate Limit Error: {e}")
-            traceback.print_exc()
+            log.warning("DeepSeek API rate limit error: %s", e)
             return f"Error (Rate Limit): DeepSeek API request failed. Details: {e}"
         except APIStatusError as e: # This catches HTTP status errors like 4xx, 5xx
             error_message = getattr(e, 'message', str(e))
-            print(Fore.RED + f"DeepSeek API Status Error (Status Code: {e.status_code}): {error_message}")
-            traceback.print_exc()
+            log.warning("DeepSeek API status error (status code: %s): %s", e.status_code, error_message)
             return f"Error (API Status {e.status_code}): DeepSeek API request failed. Details: {error_message}"
         except Exception as e: # General catch-all
-            print(Fore.RED + f"An unexpected error occurred during DeepSeek API call:")
-            traceback.print_exc()
+            log.exception("Unexpected error during DeepSeek API call")
             return f"Error (Unexpected): Failed to generate notes via DeepSeek API. Details: {str(e)}"
 
+    def split_into_batches(self, segments):
+        batches, batch, batch_chars = [], [], 0
+        for segment in segments:
+            segment_chars = len(segment['text'])
+            if batch and (len(batch) >= MAX_BATCH_SEGMENTS or batch_chars + segment_chars > MAX_BATCH_CHARS):
+                batches.append(batch)
+                batch, batch_chars = [], 0
+            batch.append(segment)
+            batch_chars += segment_chars
+        if batch:
+            batches.append(batch)
+        return batches
+
     def generate_notes_from_segments(self, segments_to_process):
-        depth_level = self.config['note_taking']['depth_level']
-        transcript_text_for_ai = self.format_transcript_for_ai(segments_to_process)
-        if not transcript_text_for_ai:
+        # Bound each prompt so a long backlog becomes several requests instead of one huge one
+        prompts = [p for p in map(self.format_transcript_for_ai, self.split_into_batches(segments_to_process)) if p]
+        if not prompts:
             print(Fore.YELLOW + "No text formatted for AI. Skipping note generation.")
             return None
         current_time_str = datetime.now().strftime('%H:%M:%S')
-        print(Fore.CYAN + f"[{current_time_str}] Generating notes with depth: {depth_level}...")
-        if depth_level == "minimal": return self.get_minimal_notes(transcript_text_for_ai)
-        elif depth_level == "standard": return self.get_standard_notes(transcript_text_for_ai)
-        elif depth_level == "detailed": return self.get_detailed_notes(transcript_text_for_ai)
-        elif depth_level == "comprehensive": return self.get_comprehensive_notes(transcript_text_for_ai)
-        else:
-            print(Fore.YELLOW + f"Warning: Unknown depth_level '{depth_level}'. Defaulting to 'standard'.")
-            return self.get_standard_notes(transcript_text_for_ai)
+        if len(prompts) == 1:
+            print(Fore.CYAN + f"[{current_time_str}] Generating notes with depth: {self._depth_level}...")
+            self._echo_deltas = not self.config['output']['new_terminal']
+            return self._notes_fn(prompts[0])
+        
+        print(Fore.CYAN + f"[{current_time_str}] Generating notes with depth: {self._depth_level} in {len(prompts)} batches...")
+        self._echo_deltas = False # Concurrent streams would interleave on the console
+        with ThreadPoolExecutor(max_workers=min(MAX_BATCH_WORKERS, len(prompts))) as pool:
+            batch_notes = list(pool.map(self._notes_fn, prompts))
+        for notes in batch_notes:
+            if self.is_failed_notes(notes): return notes
+        return "\n\n".join(batch_notes)
+
+    def is_failed_notes(self, notes):
+        return not notes or "Error" in notes[:30] or "Warning:" in notes[:30] # Broader check for issues
 
     def display_in_new_terminal(self, content_to_display):
         current_time_str = datetime.now().strftime('%H:%M:%S')
         try:
-            # Escape for AppleScript string literals AND shell command embedded in 'do script'
-            # 1. Escape backslashes for AppleScript
-            escaped = content_to_display.replace('\\', '\\\\')
-            # 2. Escape double quotes for AppleScript string AND for shell echo
-            escaped = escaped.replace('"', '\\"')
-            # 3. Escape dollar signs for shell
-            escaped = escaped.replace('$', '\\$')
-            # 4. Escape backticks for shell
-            escaped = escaped.replace('`', '\\`')
-            # 5. Convert Python newlines to AppleScript newlines for the 'echo' command
-            escaped = escaped.replace('\n', '\\n')
-
-
-            script = f'''
-            tell application "Terminal"
-                if not (exists window 1) then reopen
-                activate
-                do script "clear && echo \\"{escaped}\\" && echo \\"\\\\n--- Research Notes Generated at {current_time_str} (DeepSeek) ---\\" && echo \\"\\\\n(Terminal may close or press Ctrl+C to close sooner)\\" && sleep 5"
-            end tell'''
-            
-            # For debugging AppleScript:
-            # print(Fore.MAGENTA + "---- Generated AppleScript ----")
-            # print(script)
-            # print("-----------------------------")
+            # Hand the notes to Terminal as files instead of escaping them into an AppleScript literal
+            with tempfile.NamedTemporaryFile('w', suffix='.notes.txt', encoding='utf-8', delete=False) as notes_fp:
+                notes_fp.write(content_to_display)
+            with tempfile.NamedTemporaryFile('w', suffix='.command', delete=False) as script_fp:
+                script_fp.write(
+                    "#!/bin/sh\n"
+                    "clear\n"
+                    f"cat {shlex.quote(notes_fp.name)}\n"
+                    f"rm -f {shlex.quote(notes_fp.name)} \"$0\"\n"
+                    f"echo \"\\n--- Research Notes Generated at {current_time_str} (DeepSeek) ---\"\n"
+                    "echo \"\\n(Terminal may close or press Ctrl+C to close sooner)\"\n"
+                    "sleep 5\n"
+                )
+            os.chmod(script_fp.name, 0o700)
 
-            subprocess.run(['osascript', '-e', script], check=True, timeout=15) # Increased timeout slightly
+            subprocess.run(['open', '-a', 'Terminal', script_fp.name], check=True, timeout=15)
             print(Fore.GREEN + f"[{current_time_str}] Notes displayed in new terminal.")
         except subprocess.TimeoutExpired:
             print(Fore.YELLOW + f"[{current_time_str}] New terminal display command timed out. Notes were likely displayed but script didn't wait.")
         except subprocess.CalledProcessError as e:
-            print(Fore.RED + f"Error running AppleScript for new terminal (Code: {e.returncode}): {e}")
-            # print(Fore.RED + f"Failed AppleScript was:\n{script}") # Uncomment to see the script that failed
+            print(Fore.RED + f"Error opening new terminal (Code: {e.returncode}): {e}")
+            self._remove_files(notes_fp.name, script_fp.name)  # The script never ran to clean up
             self.fallback_display(content_to_display)
         except Exception as e:
             print(Fore.RED + f"General error displaying in new terminal: {e}")
             self.fallback_display(content_to_display)
 
+    def _remove_files(self, *paths):
+        for path in paths:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
     def fallback_display(self, content_to_display):
         print(Fore.YELLOW + "\n" + "="*60 + Style.BRIGHT + "\nRESEARCH NOTES (Fallback Display)" + Style.NORMAL + "\n" + "="*60)
         print(content_to_display)
         print("="*60)
 
+    def setup_notes_log(self):
+        self._notes_log_fp = None
+        if not self.config['output']['log_to_file']:
+            return
+        log_file_path = self.config['files']['notes_log']
+        try:
+            self._notes_log_fp = open(log_file_path, 'a', encoding='utf-8', buffering=1 << 16)
+            atexit.register(self.close_notes_log)
+        except Exception as e:
+            print(Fore.RED + f"Error opening notes log file '{log_file_path}': {e}")
+
+    def close_notes_log(self):
+        if self._notes_log_fp and not self._notes_log_fp.closed:
+            self._notes_log_fp.close()
+
     def log_notes_to_file(self, notes_content):
-        if self.config['output']['log_to_file']:
+        if self._notes_log_fp:
             log_file_path = self.config['files']['notes_log']
             try:
-                with open(log_file_path, 'a', encoding='utf-8') as f:
-                    f.write(f"\n\n{'='*80}\nRESEARCH NOTES - {datetime.now().isoformat()} (DeepSeek)\n{'-'*80}\n{notes_content}\n{'='*80}\n")
+                self._notes_log_fp.write(f"\n\n{'='*80}\nRESEARCH NOTES - {datetime.now().isoformat()} (DeepSeek)\n{'-'*80}\n{notes_content}\n{'='*80}\n")
+                # Flushed per batch: the processed log advances right after this, so notes must reach the file
+                self._notes_log_fp.flush()
                 print(Fore.GREEN + f"[{datetime.now().strftime('%H:%M:%S')}] Notes appended to: {log_file_path}")
             except Exception as e:
                 print(Fore.RED + f"Error logging notes to file '{log_file_path}': {e}")
 
     def process_transcript_and_generate_notes(self):
         current_time_str = datetime.now().strftime('%H:%M:%S')
+        if self._generation_thread is not None and self._generation_thread.is_alive():
+            print(Fore.YELLOW + f"[{current_time_str}] Previous note generation still in progress. Skipping this check.")
+            return
         print(Style.BRIGHT + Fore.CYAN + f"\n[{current_time_str}] Checking for new transcript segments...")
         new_segments = self.get_recent_transcript_segments()
         if not new_segments:
@@ -383,26 +630,41 @@ class TranscriptMonitor:
             return
         
         print(Fore.GREEN + f"[{current_time_str}] Found {len(new_segments)} new segment(s).")
-        generated_notes = self.generate_notes_from_segments(new_segments)
-        
-        if not generated_notes or "Error" in generated_notes[:30] or "Warning:" in generated_notes[:30]: # Broader check for issues
-            print(Fore.RED + f"[{current_time_str}] Failed to generate notes or error/warning occurred. Details: {generated_notes}")
-            # Optionally, decide if you still want to update last_processed_time or retry
-            return 
+        # The DeepSeek round-trip runs in the background so the monitoring loop keeps its schedule
+        self._generation_thread = threading.Thread(
+            target=self.generate_and_publish_notes,
+            args=(new_segments, self._pending_offset, current_time_str),
+            daemon=True
+        )
+        self._generation_thread.start()
+
+    def generate_and_publish_notes(self, new_segments, pending_offset, current_time_str):
+        try:
+            generated_notes = self.generate_notes_from_segments(new_segments)
+            
+            if self.is_failed_notes(generated_notes):
+                print(Fore.RED + f"[{current_time_str}] Failed to generate notes or error/warning occurred. Details: {generated_notes}")
+                # Optionally, decide if you still want to update last_processed_time or retry
+                return 
+                
+            if self.config['output']['new_terminal']:
+                self.display_in_new_terminal(generated_notes)
+            elif not self._echo_deltas:
+                self.fallback_display(generated_notes)
+            # Otherwise the notes were already printed while streaming in
+            
+            self.log_notes_to_file(generated_notes)
             
-        if self.config['output']['new_terminal']:
-            self.display_in_new_terminal(generated_notes)
-        else:
-            self.fallback_display(generated_notes)
-        
-        self.log_notes_to_file(generated_notes)
-        
-        if new_segments: # Should be true if notes were generated
             latest_segment_time_epoch = new_segments[-1]['start'] # Segments are sorted
+            self.last_processed_time = latest_segment_time_epoch
+            self.last_offset = pending_offset
             self.save_last_processed_time(latest_segment_time_epoch)
             print(Fore.GREEN + f"[{current_time_str}] Last processed time updated to: {datetime.fromtimestamp(latest_segment_time_epoch).isoformat()}")
-        
-        print(Style.BRIGHT + Fore.GREEN + f"[{current_time_str}] ✓ Research notes generation cycle complete!")
+            
+            print(Style.BRIGHT + Fore.GREEN + f"[{current_time_str}] ✓ Research notes generation cycle complete!")
+        except Exception:
+            print(Fore.RED + f"An unexpected error occurred during note generation:")
+            traceback.print_exc()
 
     def start_monitoring_loop(self):
         interval_seconds = self.config['monitoring']['interval_minutes'] * 60
@@ -414,18 +676,35 @@ class TranscriptMonitor:
         print(f" - Processed timestamps log: {self.config['files']['processed_log']}")
         print(Fore.YELLOW + "Press Ctrl+C to stop monitoring.\n" + "="*60)
         try:
+            # Anchor ticks to a monotonic schedule so time spent processing doesn't accumulate as drift
+            next_tick = time.monotonic()
             while True:
                 self.process_transcript_and_generate_notes()
-                next_check_dt = datetime.now() + timedelta(seconds=interval_seconds)
+                next_tick += interval_seconds
+                sleep_seconds = next_tick - time.monotonic()
+                if sleep_seconds < 0: # Overran the deadline; restart the schedule from now
+                    next_tick = time.monotonic() + interval_seconds
+                    sleep_seconds = interval_seconds
+                next_check_dt = datetime.now() + timedelta(seconds=sleep_seconds)
                 print(Fore.CYAN + f"[{datetime.now().strftime('%H:%M:%S')}] Next check at {next_check_dt.strftime('%H:%M:%S')}. Sleeping...")
-                time.sleep(interval_seconds)
+                time.sleep(sleep_seconds)
         except KeyboardInterrupt:
             print(Fore.YELLOW + "\n\nMonitoring stopped by user.")
+            if self._generation_thread is not None and self._generation_thread.is_alive():
+                print(Fore.YELLOW + "Waiting for in-flight note generation to finish (Ctrl+C again to abort)...")
+                try:
+                    self._generation_thread.join()
+                except KeyboardInterrupt:
+                    pass
         except Exception as e_loop: # Catch any other unexpected error in the main loop
             print(Fore.RED + Style.BRIGHT + f"\nFATAL ERROR in monitoring loop:")
             traceback.print_exc()
+        finally:
+            self.close_notes_log()
+            self._httpx.close()
 
 def main():
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(levelname)s %(message)s")
     try:
         monitor = TranscriptMonitor(config_path="config.yaml") # Or pass a different path
         monitor.start_monitoring_loop()
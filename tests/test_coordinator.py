@@ -0,0 +1,57 @@
+import logging
+import os
+import signal
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from coordinator import SystemCoordinator
+from ipc import SharedState
+
+
+class ScanChildProcessesTest(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        self._handlers = {sig: signal.getsignal(sig) for sig in (signal.SIGINT, signal.SIGTERM)}
+
+        with open('config.yaml', 'w') as f:
+            f.write("architecture:\n  use_tmux: false\n  start_method: forkserver\n")
+        self.coordinator = SystemCoordinator('config.yaml')
+
+    def tearDown(self):
+        coordinator = self.coordinator
+        if coordinator.worker_pool:
+            coordinator.worker_pool.terminate()
+            coordinator.worker_pool.join()
+        for name in ('transcript', 'notes'):
+            coordinator.queues[name].close()
+        if isinstance(coordinator.shared_state, SharedState):
+            coordinator.shared_state.close()
+        if coordinator._shared_config:
+            coordinator._shared_config.close()
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+            handler.close()
+        for sig, handler in self._handlers.items():
+            signal.signal(sig, handler)
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def test_includes_pool_workers(self):
+        self.coordinator.start_worker_pool()
+        worker_pids = {worker.pid for worker in self.coordinator.worker_pool._pool}
+
+        self.coordinator.scan_child_processes()
+
+        self.assertTrue(worker_pids)
+        self.assertTrue(worker_pids <= set(self.coordinator._child_procs))
+
+
+if __name__ == '__main__':
+    unittest.main()
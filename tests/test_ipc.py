@@ -0,0 +1,87 @@
+import multiprocessing as mp
+import os
+import sys
+import unittest
+from multiprocessing.connection import wait
+from queue import Full
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ipc import ShmRing, waitable
+
+
+def _produce(ring, count):
+    for i in range(count):
+        ring.put({'seq': i})
+
+
+class ShmRingTest(unittest.TestCase):
+    def setUp(self):
+        self.ctx = mp.get_context('fork')
+        self.ring = ShmRing(f'test_ring_{os.getpid()}', 4, slot_size=128, ctx=self.ctx)
+
+    def tearDown(self):
+        self.ring.close()
+
+    def test_put_get(self):
+        segment = {'text': 'hello', 'start': 1.5, 'tags': ['a', 'b']}
+        self.ring.put(segment)
+
+        self.assertEqual(self.ring.qsize(), 1)
+        self.assertEqual(self.ring.get(timeout=1), segment)
+        self.assertTrue(self.ring.empty())
+
+    def test_wraps_around(self):
+        for i in range(self.ring.capacity * 3):
+            self.ring.put(i)
+            self.ring.put(-i)
+            self.assertEqual(self.ring.get(timeout=1), i)
+            self.assertEqual(self.ring.get(timeout=1), -i)
+
+        self.assertTrue(self.ring.empty())
+
+    def test_full(self):
+        for i in range(self.ring.capacity):
+            self.ring.put_nowait(i)
+
+        with self.assertRaises(Full):
+            self.ring.put_nowait('overflow')
+        with self.assertRaises(Full):
+            self.ring.put('overflow', timeout=0.05)
+
+        self.assertEqual([self.ring.get_nowait() for _ in range(self.ring.capacity)],
+                         list(range(self.ring.capacity)))
+
+    def test_spills_oversized_payload(self):
+        notes = 'x' * (self.ring.slot_size * 10)
+        self.ring.put({'notes': notes})
+        self.ring.put('after')
+
+        self.assertEqual(self.ring.get(timeout=1), {'notes': notes})
+        self.assertEqual(self.ring.get(timeout=1), 'after')
+
+    def test_doorbell_wakes_wait(self):
+        reader = waitable(self.ring)
+        self.assertEqual(wait([reader], timeout=0), [])
+
+        self.ring.put('ping')
+        self.assertEqual(wait([reader], timeout=1), [reader])
+
+        self.ring.drain_bell()
+        self.assertEqual(self.ring.get_nowait(), 'ping')
+        self.assertEqual(wait([reader], timeout=0), [])
+
+    def test_across_processes(self):
+        count = self.ring.capacity * 5
+        producer = self.ctx.Process(target=_produce, args=(self.ring, count))
+        producer.start()
+
+        received = [self.ring.get(timeout=5)['seq'] for _ in range(count)]
+        producer.join(5)
+
+        self.assertEqual(received, list(range(count)))
+        self.assertEqual(producer.exitcode, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,6 +5,8 @@ Memory-efficient streaming of transcript segments
 """
 
 import os
+import bisect
+import operator
 import json
 import time
 import logging
@@ -12,22 +14,155 @@ from datetime import datetime
 from collections import deque
 from pathlib import Path
 import gc
+import functools
+import tempfile
+from json.decoder import WHITESPACE
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from ciso8601 import parse_datetime
+except ImportError:
+    parse_datetime = datetime.fromisoformat
+
+@functools.lru_cache(maxsize=4096)
+def _iso_to_epoch(timestamp_str):
+    try:
+        return parse_datetime(timestamp_str).timestamp()
+    except ValueError:
+        return float('nan')
+        
+def _vectorized_epoch(timestamp_strs):
+    # numpy reads naive ISO strings as UTC wall time; shift by the local offset
+    # when the whole batch shares one (no DST change inside it)
+    if timestamp_strs[0].endswith('Z') or timestamp_strs[0][-6:-5] in ('+', '-'):
+        return None
+    try:
+        wall = np.array(timestamp_strs, dtype='datetime64[us]').astype(np.int64) / 1e6
+    except ValueError:
+        return None
+        
+    offset = time.localtime(wall[0]).tm_gmtoff
+    epoch = wall - offset
+    if (time.localtime(epoch[0]).tm_gmtoff != offset
+            or time.localtime(epoch.max()).tm_gmtoff != offset
+            or time.localtime(epoch.min()).tm_gmtoff != offset):
+        return None
+    return epoch
+    
+def timestamps_to_epoch(timestamp_strs):
+    """
+    Convert ISO timestamps to epoch seconds, NaN where unparseable
+    Vectorized through numpy when available, per-string (cached) otherwise
+    """
+    if np is not None and timestamp_strs:
+        epoch = _vectorized_epoch(timestamp_strs)
+        if epoch is not None:
+            return epoch
+    return [_iso_to_epoch(s) for s in timestamp_strs]
+    
+def _pick_parser():
+    """
+    Bind the fastest available transcript parser once, like simdjson's
+    own runtime dispatch: simdjson, then orjson, then the stdlib decoder
+    """
+    if simdjson is not None:
+        parser = simdjson.Parser()  # Reused, so its document buffer is kept across ticks
+        
+        def parse_simdjson(json_path):
+            for segment in parser.load(str(json_path)):
+                yield {
+                    'timestamp': segment.get('timestamp'),
+                    'raw_transcript': segment.get('raw_transcript'),
+                    'chunk_id': segment.get('chunk_id')
+                }
+        return parse_simdjson
+        
+    if orjson is not None:
+        def parse_orjson(json_path):
+            # read() rather than mmap: the recorder rewrites this file in place, and a
+            # truncation under a live mapping is a SIGBUS instead of a catchable error
+            with open(json_path, 'rb') as f:
+                data = orjson.loads(f.read())
+            yield from data
+        return parse_orjson
+        
+    def parse_stdlib(json_path):
+        with open(json_path, 'rb') as f:
+            text = f.read().decode('utf-8')
+            
+        # Walk the array with an advancing index instead of re-slicing a buffer
+        decoder = json.JSONDecoder()
+        idx = WHITESPACE.match(text, 0).end()
+        if text.startswith('[', idx):
+            idx += 1
+            
+        while True:
+            idx = WHITESPACE.match(text, idx).end()
+            if idx >= len(text) or text[idx] == ']':
+                break
+                
+            obj, idx = decoder.raw_decode(text, idx)
+            yield obj
+            
+            idx = WHITESPACE.match(text, idx).end()
+            if text.startswith(',', idx):
+                idx += 1
+    return parse_stdlib
+    
+_PARSE_IMPL = _pick_parser()
+
+def invalid_time_indices(segment_times):
+    if np is not None and isinstance(segment_times, np.ndarray):
+        return np.flatnonzero(np.isnan(segment_times))
+    return [i for i, t in enumerate(segment_times) if t != t]
+    
+def find_new_indices(segment_times, cutoff):
+    # The transcript is append-only and chronological, so the cutoff can usually be
+    # binary-searched; a NaN or out-of-order entry fails the check and takes the scan
+    if np is None or not isinstance(segment_times, np.ndarray):
+        if all(map(operator.le, segment_times, segment_times[1:])):
+            return range(bisect.bisect_right(segment_times, cutoff), len(segment_times))
+        return [i for i, t in enumerate(segment_times) if t > cutoff]
+    if (segment_times[1:] >= segment_times[:-1]).all():
+        return np.arange(np.searchsorted(segment_times, cutoff, side='right'), segment_times.shape[0])
+    return np.flatnonzero(segment_times > cutoff)
+    
 class TranscriptMonitor:
-    def __init__(self, config, output_queue, shared_state, shutdown_event):
+    def __init__(self, config, output_queue, shared_state, shutdown_event, ready_event=None):
         self.config = config
         self.output_queue = output_queue
         self.shared_state = shared_state
         self.shutdown_event = shutdown_event
+        self.ready_event = ready_event
         
         self.setup_logging()
         
         self.transcript_path = Path(self.config['files']['transcript_path'])
         self.processed_log = Path(self.config['files']['processed_log'])
         self.last_processed_time = self.load_last_processed_time()
+        self._saved_time = self.last_processed_time
+        self._last_save_at = 0.0
+        self.save_interval = config.get('monitoring', {}).get('save_interval_seconds', 5)
+        
+        self._parse_file = _PARSE_IMPL
         
         self.max_buffer_size = config.get('architecture', {}).get('transcript_buffer_size', 100)
         self.recent_segments = deque(maxlen=self.max_buffer_size)
+        self._published_state = None
         
         self.check_interval = self.config['monitoring']['interval_minutes'] * 60
         
@@ -43,130 +178,138 @@ class TranscriptMonitor:
                     if content:
                         return float(content)
             except (ValueError, IOError) as e:
-                self.logger.warning(f"Could not load last processed time: {e}")
+                self.logger.warning("Could not load last processed time: %s", e)
         return 0.0
         
-    def save_last_processed_time(self, timestamp):
+    def save_last_processed_time(self, force=False):
+        # Debounced: at most one write per save_interval unless forced
+        timestamp = self.last_processed_time
+        if timestamp == self._saved_time:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_save_at < self.save_interval:
+            return
+            
+        tmp_path = None
         try:
-            with open(self.processed_log, 'w') as f:
+            # Write then rename, so a crash never leaves a truncated log behind
+            fd, tmp_path = tempfile.mkstemp(dir=self.processed_log.parent, prefix='.processed_')
+            # mkstemp creates 0600; keep the log's existing mode (0644 for a new one)
+            try:
+                mode = self.processed_log.stat().st_mode & 0o777
+            except FileNotFoundError:
+                mode = 0o644
+            os.fchmod(fd, mode)
+            with os.fdopen(fd, 'w') as f:
                 f.write(str(timestamp))
-        except IOError as e:
-            self.logger.error(f"Failed to save last processed time: {e}")
+            os.replace(tmp_path, self.processed_log)
+            self._saved_time = timestamp
+            self._last_save_at = now
+        except OSError as e:
+            self.logger.error("Failed to save last processed time: %s", e)
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
             
     def get_latest_session_path(self):
-        if not self.transcript_path.is_dir():
+        # One pass over the directory; DirEntry.is_dir() needs no extra stat()
+        latest = None
+        try:
+            with os.scandir(self.transcript_path) as entries:
+                for entry in entries:
+                    if (entry.name.startswith("session_") and entry.is_dir(follow_symlinks=False)
+                            and (latest is None or entry.name > latest.name)):
+                        latest = entry
+        except (FileNotFoundError, NotADirectoryError):
             return None
             
-        session_dirs = [
-            d for d in self.transcript_path.iterdir()
-            if d.is_dir() and d.name.startswith("session_")
-        ]
+        return Path(latest.path) if latest else None
         
-        if not session_dirs:
-            return None
-            
-        return max(session_dirs, key=lambda d: d.name)
+    def get_transcript_file(self, session_path):
+        try:
+            with os.scandir(session_path) as entries:
+                for entry in entries:
+                    if entry.name.startswith("transcript_chunks_") and entry.name.endswith(".json"):
+                        return Path(entry.path)
+        except FileNotFoundError:
+            pass
+        return None
         
     def stream_transcript_segments(self, json_path):
         """
         Memory-efficient streaming of transcript segments
-        Uses generator to avoid loading entire file into memory
+        Parser implementation is picked once at import, see _pick_parser()
         """
         try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                file_size = os.path.getsize(json_path)
-                
-                if file_size > 10 * 1024 * 1024:  # 10MB threshold
-                    self.logger.info(f"Large transcript file ({file_size/1024/1024:.1f}MB), using streaming mode")
-                    
-                    decoder = json.JSONDecoder()
-                    buffer = ''
-                    
-                    for chunk in iter(lambda: f.read(4096), ''):
-                        buffer += chunk
-                        buffer = buffer.lstrip()
-                        
-                        if not buffer:
-                            continue
-                            
-                        if buffer[0] == '[':
-                            buffer = buffer[1:].lstrip()
-                            
-                        while buffer:
-                            try:
-                                if buffer[0] == ']':
-                                    break
-                                    
-                                obj, idx = decoder.raw_decode(buffer)
-                                yield obj
-                                
-                                buffer = buffer[idx:].lstrip()
-                                if buffer and buffer[0] == ',':
-                                    buffer = buffer[1:].lstrip()
-                                    
-                            except json.JSONDecodeError:
-                                break
-                else:
-                    data = json.load(f)
-                    for segment in data:
-                        yield segment
-                        
-        except (IOError, json.JSONDecodeError) as e:
-            self.logger.error(f"Error reading transcript file {json_path}: {e}")
+            yield from self._parse_file(json_path)
+        except (IOError, ValueError) as e:
+            self.logger.error("Error reading transcript file %s: %s", json_path, e)
             return
             
     def process_new_segments(self):
+        # The parse allocates many acyclic containers; keep the cyclic GC out of the way
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self._process_new_segments()
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+                
+    def _process_new_segments(self):
         latest_session = self.get_latest_session_path()
         if not latest_session:
-            return []
-            
-        transcript_files = list(latest_session.glob("transcript_chunks_*.json"))
-        if not transcript_files:
-            return []
+            return 0
             
-        transcript_file = transcript_files[0]
+        transcript_file = self.get_transcript_file(latest_session)
+        if not transcript_file:
+            return 0
         
-        new_segments = []
+        # Pass 1: pull the fields out into parallel lists
+        timestamp_strs = []
+        raw_texts = []
+        chunk_ids = []
         segments_processed = 0
         
         for segment in self.stream_transcript_segments(transcript_file):
             segments_processed += 1
             
-            if segments_processed % 100 == 0:
-                gc.collect()
-                
             timestamp_str = segment.get('timestamp')
             raw_text = segment.get('raw_transcript')
             
             if not timestamp_str or raw_text is None:
                 continue
                 
-            try:
-                dt_object = datetime.fromisoformat(timestamp_str)
-                segment_time = dt_object.timestamp()
-            except ValueError:
-                self.logger.warning(f"Invalid timestamp: {timestamp_str}")
-                continue
-                
-            if segment_time > self.last_processed_time:
-                segment_data = {
-                    'start': segment_time,
-                    'text': raw_text,
-                    'chunk_id': segment.get('chunk_id'),
-                    'timestamp': timestamp_str
-                }
-                
-                new_segments.append(segment_data)
-                self.recent_segments.append(segment_data)
+            timestamp_strs.append(timestamp_str)
+            raw_texts.append(raw_text)
+            chunk_ids.append(segment.get('chunk_id'))
+            
+        # Pass 2: convert every timestamp in one go, then pick out the new ones
+        segment_times = timestamps_to_epoch(timestamp_strs)
+        
+        for i in invalid_time_indices(segment_times):
+            self.logger.warning("Invalid timestamp: %s", timestamp_strs[i])
+            
+        new_segments = []
+        
+        for i in find_new_indices(segment_times, self.last_processed_time):
+            segment_data = {
+                'start': float(segment_times[i]),
+                'text': raw_texts[i],
+                'chunk_id': chunk_ids[i],
+                'timestamp': timestamp_strs[i]
+            }
+            
+            new_segments.append(segment_data)
+            self.recent_segments.append(segment_data)
+            
+            if len(new_segments) >= 50:
+                self.flush_segments(new_segments)
+                new_segments = []
                 
-                if len(new_segments) >= 50:
-                    self.flush_segments(new_segments)
-                    new_segments = []
-                    
         if new_segments:
             self.flush_segments(new_segments)
             
-        self.shared_state['total_segments'] = len(self.recent_segments)
+        self.publish_state()
         
         return segments_processed
         
@@ -184,58 +327,72 @@ class TranscriptMonitor:
             self.output_queue.put(batch, timeout=5)
             
             if segments:
-                latest_time = max(s['start'] for s in segments)
-                self.last_processed_time = latest_time
-                self.save_last_processed_time(latest_time)
-                self.shared_state['last_processed'] = latest_time
+                self.last_processed_time = max(s['start'] for s in segments)
                 
-            self.logger.info(f"Flushed {len(segments)} segments to processing queue")
+            self.logger.info("Flushed %d segments to processing queue", len(segments))
             
         except Exception as e:
-            self.logger.error(f"Failed to flush segments: {e}")
+            self.logger.error("Failed to flush segments: %s", e)
             
+    def publish_state(self):
+        # One write per field per tick, and only when the value changed
+        state = (self.last_processed_time, len(self.recent_segments))
+        if state == self._published_state:
+            return
+            
+        self.shared_state['last_processed'] = state[0]
+        self.shared_state['total_segments'] = state[1]
+        self._published_state = state
+        
     def cleanup_memory(self):
         self.recent_segments.clear()
-        gc.collect()
+        gc.collect(0)
         self.logger.info("Memory cleanup completed")
         
     def run(self):
         self.logger.info("Transcript Monitor started")
-        self.logger.info(f"Monitoring: {self.transcript_path}")
-        self.logger.info(f"Buffer size: {self.max_buffer_size} segments")
+        self.logger.info("Monitoring: %s", self.transcript_path)
+        self.logger.info("Buffer size: %s segments", self.max_buffer_size)
+        
+        if self.ready_event:
+            self.ready_event.set()
         
         last_cleanup = time.time()
         cleanup_interval = 300  # 5 minutes
         
         while not self.shutdown_event.is_set():
             try:
-                self.logger.debug("Checking for new transcript segments...")
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("Checking for new transcript segments...")
                 segments_count = self.process_new_segments()
                 
                 if segments_count > 0:
-                    self.logger.info(f"Processed {segments_count} transcript segments")
+                    self.logger.info("Processed %d transcript segments", segments_count)
                     
                 if time.time() - last_cleanup > cleanup_interval:
                     self.cleanup_memory()
                     last_cleanup = time.time()
                     
+                self.save_last_processed_time()
                 self.shutdown_event.wait(timeout=self.check_interval)
                 
             except Exception as e:
-                self.logger.error(f"Error in monitor loop: {e}", exc_info=True)
+                self.logger.error("Error in monitor loop: %s", e, exc_info=True)
                 time.sleep(5)
                 
+        self.save_last_processed_time(force=True)
         self.logger.info("Transcript Monitor shutting down")
         
 if __name__ == "__main__":
     import yaml
     import multiprocessing as mp
+    from ipc import make_shared_state
     
     with open('config.yaml', 'r') as f:
         config = yaml.safe_load(f)
         
     queue = mp.Queue()
-    shared_state = mp.Manager().dict()
+    shared_state = make_shared_state()
     shutdown_event = mp.Event()
     
     monitor = TranscriptMonitor(config, queue, shared_state, shutdown_event)
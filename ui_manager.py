@@ -10,22 +10,52 @@ import subprocess
 import json
 from datetime import datetime
 from collections import deque
+from itertools import islice
+from queue import Empty
+from multiprocessing.connection import wait
 import sys
 import os
 
+from ipc import ShmRing, waitable
+
+TIME_FORMAT = '%H:%M:%S'
+
+_BANNER = "=" * 60
+_RULE = "-" * 60
+_NOTE_RULE = "-" * 40
+_STATUS_HEADER = f"{_BANNER}\nSYSTEM STATUS\n{_BANNER}"
+_NOTES_HEADER = f"{_BANNER}\nGENERATED NOTES\n{_BANNER}"
+_TRANSCRIPT_HEADER = f"{_BANNER}\nRECENT TRANSCRIPTS\n{_BANNER}"
+
+def _join_lines(lines, max_chars=None):
+    # Same result as "\n".join(lines)[:max_chars], without joining lines past the cut
+    if max_chars is None:
+        return "\n".join(lines)
+    kept = []
+    size = -1
+    for line in lines:
+        kept.append(line)
+        size += len(line) + 1
+        if size >= max_chars:
+            break
+    return "\n".join(kept)[:max_chars]
+
 class UIManager:
-    def __init__(self, config, queues, shared_state, shutdown_event, tmux_session=None):
+    def __init__(self, config, queues, shared_state, shutdown_event, tmux_session=None, ready_event=None):
         self.config = config
         self.queues = queues
         self.shared_state = shared_state
         self.shutdown_event = shutdown_event
+        self.ready_event = ready_event
         self.tmux_session = tmux_session
         
         self.setup_logging()
         
         self.notes_buffer = deque(maxlen=10)
         self.status_buffer = deque(maxlen=20)
-        self.transcript_buffer = deque(maxlen=50)
+        self.transcript_lines = deque(maxlen=50)
+        self.live_notes = []
+        self._last_hash = {}
         
         self.use_tmux = config.get('architecture', {}).get('use_tmux', True) and tmux_session
         self.display_mode = config.get('output', {}).get('display_format', 'clean')
@@ -38,25 +68,30 @@ class UIManager:
         if not self.use_tmux or not self.tmux_session:
             return False
             
-        try:
-            escaped_content = content.replace("'", "'\\''")
-            
-            cmd = [
-                'tmux', 'send-keys', '-t', f'{self.tmux_session}:0.{pane_idx}',
-                'C-c', 'Enter'
-            ]
-            subprocess.run(cmd, capture_output=True)
+        content_hash = hash(content)
+        if self._last_hash.get(pane_idx) == content_hash:
+            return True  # Pane already shows this content
             
+        try:
+            # Content goes in over stdin as a named buffer, so nothing needs shell escaping;
+            # the pane prints it with show-buffer. Both steps share one tmux invocation.
+            buffer_name = f'rt_{pane_idx}'
             cmd = [
-                'tmux', 'send-keys', '-t', f'{self.tmux_session}:0.{pane_idx}',
-                f"clear && echo '{escaped_content}'", 'Enter'
+                'tmux', 'load-buffer', '-b', buffer_name, '-', ';',
+                'send-keys', '-t', f'{self.tmux_session}:0.{pane_idx}',
+                'C-c', f'clear && tmux show-buffer -b {buffer_name}', 'Enter'
             ]
-            subprocess.run(cmd, capture_output=True)
+            result = subprocess.run(cmd, input=content.encode('utf-8'), capture_output=True)
+            if result.returncode != 0:
+                self.logger.error("Failed to send to tmux pane %s: %s", pane_idx,
+                                  result.stderr.decode('utf-8', 'replace').strip())
+                return False
+            self._last_hash[pane_idx] = content_hash
             
             return True
             
         except Exception as e:
-            self.logger.error(f"Failed to send to tmux pane {pane_idx}: {e}")
+            self.logger.error("Failed to send to tmux pane %s: %s", pane_idx, e)
             return False
             
     def display_in_new_terminal(self, content):
@@ -79,7 +114,7 @@ class UIManager:
                 return True
                 
             except Exception as e:
-                self.logger.error(f"Failed to open new terminal: {e}")
+                self.logger.error("Failed to open new terminal: %s", e)
                 return False
                 
         elif sys.platform.startswith('linux'):
@@ -104,28 +139,28 @@ class UIManager:
         return False
         
     def format_status_display(self):
-        lines = []
-        lines.append("="*60)
-        lines.append("SYSTEM STATUS")
-        lines.append("="*60)
-        
-        lines.append(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        lines.append(f"Memory Usage: {self.shared_state.get('memory_usage', 0):.1f} MB")
-        lines.append(f"Total Segments: {self.shared_state.get('total_segments', 0)}")
+        lines = [
+            f"{_STATUS_HEADER}\n"
+            f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+            f"Memory Usage: {self.shared_state.get('memory_usage', 0):.1f} MB\n"
+            f"Total Segments: {self.shared_state.get('total_segments', 0)}"
+        ]
         
         last_processed = self.shared_state.get('last_processed', 0)
         if last_processed > 0:
             last_time = datetime.fromtimestamp(last_processed).strftime('%H:%M:%S')
             lines.append(f"Last Processed: {last_time}")
             
-        lines.append("-"*60)
+        lines.append(_RULE)
         
         if self.status_buffer:
             latest_status = self.status_buffer[-1]
-            lines.append(f"CPU: {latest_status.get('cpu_percent', 0):.1f}%")
-            lines.append(f"Total Memory: {latest_status.get('memory_mb', 0):.1f} MB")
-            lines.append("")
-            lines.append("Process Status:")
+            lines.append(
+                f"CPU: {latest_status.get('cpu_percent', 0):.1f}%\n"
+                f"Total Memory: {latest_status.get('memory_mb', 0):.1f} MB\n"
+                "\n"
+                "Process Status:"
+            )
             
             for proc_name, proc_info in latest_status.get('processes_status', {}).items():
                 status = "✓ Running" if proc_info['alive'] else "✗ Stopped"
@@ -133,38 +168,36 @@ class UIManager:
                 
         return "\n".join(lines)
         
-    def format_notes_display(self):
-        lines = []
-        lines.append("="*60)
-        lines.append("GENERATED NOTES")
-        lines.append("="*60)
+    def format_notes_display(self, max_chars=None):
+        lines = [_NOTES_HEADER]
         
-        if not self.notes_buffer:
+        if not self.notes_buffer and not self.live_notes:
             lines.append("No notes generated yet...")
         else:
             for note_data in self.notes_buffer:
-                lines.append(f"\n[{note_data['timestamp']}]")
-                lines.append(f"Depth: {note_data['depth_level']} | Segments: {note_data['segment_count']}")
-                lines.append("-"*40)
+                lines.append(
+                    f"\n[{note_data['timestamp']}]\n"
+                    f"Depth: {note_data['depth_level']} | Segments: {note_data['segment_count']}\n"
+                    f"{_NOTE_RULE}"
+                )
                 lines.append(note_data['notes'])
                 lines.append("")
                 
-        return "\n".join(lines)
+            if self.live_notes:
+                lines.append(f"\n[Generating...]\n{_NOTE_RULE}")
+                lines.append("".join(self.live_notes))
+                
+        return _join_lines(lines, max_chars)
         
-    def format_transcript_display(self):
-        lines = []
-        lines.append("="*60)
-        lines.append("RECENT TRANSCRIPTS")
-        lines.append("="*60)
+    def format_transcript_display(self, max_chars=None):
+        lines = [_TRANSCRIPT_HEADER]
         
-        if not self.transcript_buffer:
+        if not self.transcript_lines:
             lines.append("No transcript segments yet...")
         else:
-            for segment in list(self.transcript_buffer)[-20:]:
-                time_str = datetime.fromtimestamp(segment['start']).strftime('%H:%M:%S')
-                lines.append(f"[{time_str}] {segment['text']}")
+            lines.extend(islice(self.transcript_lines, max(0, len(self.transcript_lines) - 20), None))
                 
-        return "\n".join(lines)
+        return _join_lines(lines, max_chars)
         
     def update_displays(self):
         if self.use_tmux:
@@ -172,20 +205,27 @@ class UIManager:
             self.send_to_tmux_pane(2, self.format_notes_display())
             self.send_to_tmux_pane(3, self.format_status_display())
         else:
-            print("\033[2J\033[H")
-            print(self.format_status_display())
-            print("\n")
-            print(self.format_transcript_display()[:500])
-            print("\n")
-            print(self.format_notes_display()[:1000])
+            # One write per refresh instead of a print per block
+            out = [
+                "\033[2J\033[H\n",
+                self.format_status_display(),
+                "\n\n\n",
+                self.format_transcript_display(max_chars=500),
+                "\n\n\n",
+                self.format_notes_display(max_chars=1000),
+                "\n"
+            ]
+            sys.stdout.write("".join(out))
+            sys.stdout.flush()
             
     def handle_ui_command(self, command):
         cmd_type = command.get('command')
         
         if cmd_type == 'cleanup_memory':
             self.notes_buffer.clear()
+            self.live_notes.clear()
             self.status_buffer.clear()
-            self.transcript_buffer = deque(maxlen=50)
+            self.transcript_lines = deque(maxlen=50)
             self.logger.info("UI memory cleaned up")
             
         elif cmd_type == 'refresh':
@@ -199,53 +239,81 @@ class UIManager:
                 else:
                     print(notes)
                     
+    def handle_notes(self, notes_data):
+        if 'notes_delta' in notes_data:
+            if notes_data.get('notes_start'):
+                self.live_notes.clear()
+            self.live_notes.append(notes_data['notes_delta'])
+            return
+            
+        if notes_data.get('notes_abort'):
+            self.live_notes.clear()
+            return
+            
+        self.live_notes.clear()
+        self.notes_buffer.append(notes_data)
+        
+        if self.config['output'].get('new_terminal', True):
+            self.display_in_new_terminal(notes_data['notes'])
+            
+        self.logger.info("Displayed new notes")
+        
+    def handle_status(self, status_data):
+        self.status_buffer.append(status_data)
+        
+    def handle_transcript(self, transcript_data):
+        if 'segments' in transcript_data:
+            # Format each line once on arrival rather than on every redraw
+            self.transcript_lines.extend(
+                f"[{time.strftime(TIME_FORMAT, time.localtime(segment['start']))}] {segment['text']}"
+                for segment in transcript_data['segments']
+            )
+            
+    def drain_queue(self, name):
+        queue = self.queues[name]
+        handler = self._handlers[name]
+        
+        if isinstance(queue, ShmRing):
+            queue.drain_bell()
+            
+        while True:
+            try:
+                item = queue.get_nowait()
+            except Empty:
+                return
+            handler(item)
+            
     def run(self):
         self.logger.info("UI Manager started")
-        self.logger.info(f"Using tmux: {self.use_tmux}")
+        self.logger.info("Using tmux: %s", self.use_tmux)
+        
+        self._handlers = {
+            'notes': self.handle_notes,
+            'status': self.handle_status,
+            'transcript': self.handle_transcript,
+            'ui_commands': self.handle_ui_command
+        }
+        # Block on all four queues at once instead of polling them every 100ms
+        readers = {waitable(self.queues[name]): name for name in self._handlers}
+        
+        if self.ready_event:
+            self.ready_event.set()
         
         last_update = time.time()
         update_interval = 2
         
         while not self.shutdown_event.is_set():
             try:
-                try:
-                    notes_data = self.queues['notes'].get_nowait()
-                    self.notes_buffer.append(notes_data)
-                    
-                    if self.config['output'].get('new_terminal', True):
-                        self.display_in_new_terminal(notes_data['notes'])
-                        
-                    self.logger.info("Displayed new notes")
-                except:
-                    pass
-                    
-                try:
-                    status_data = self.queues['status'].get_nowait()
-                    self.status_buffer.append(status_data)
-                except:
-                    pass
-                    
-                try:
-                    transcript_data = self.queues['transcript'].get_nowait()
-                    if 'segments' in transcript_data:
-                        self.transcript_buffer.extend(transcript_data['segments'])
-                except:
-                    pass
-                    
-                try:
-                    ui_command = self.queues['ui_commands'].get_nowait()
-                    self.handle_ui_command(ui_command)
-                except:
-                    pass
+                timeout = max(0, update_interval - (time.time() - last_update))
+                for reader in wait(list(readers), timeout=timeout):
+                    self.drain_queue(readers[reader])
                     
                 if time.time() - last_update > update_interval:
                     self.update_displays()
                     last_update = time.time()
                     
-                time.sleep(0.1)
-                
             except Exception as e:
-                self.logger.error(f"Error in UI loop: {e}", exc_info=True)
+                self.logger.error("Error in UI loop: %s", e, exc_info=True)
                 time.sleep(1)
                 
         self.logger.info("UI Manager shutting down")
@@ -253,6 +321,7 @@ class UIManager:
 if __name__ == "__main__":
     import yaml
     import multiprocessing as mp
+    from ipc import make_shared_state
     
     with open('config.yaml', 'r') as f:
         config = yaml.safe_load(f)
@@ -264,7 +333,7 @@ if __name__ == "__main__":
         'status': mp.Queue()
     }
     
-    shared_state = mp.Manager().dict()
+    shared_state = make_shared_state()
     shutdown_event = mp.Event()
     
     ui = UIManager(config, queues, shared_state, shutdown_event, None)